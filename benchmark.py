@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+import multiprocessing
+import time as timer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "srcs"))
+
+from puzzle_generator import make_puzzle  # noqa: E402
+from Generator import random_boards  # noqa: E402
+from Api import get_solver  # noqa: E402
+from Errors import PuzzleError  # noqa: E402
+from Parser import ALGORITHMS  # noqa: E402
+from Puzzle import Puzzle  # noqa: E402
+
+HEURISTICS = ("manhattan", "manhattan+linear", "pdb", "walking")
+# Korf's 100 15-puzzle instances, part of the default corpus so that every machine runs the same boards
+KORF_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "korf100.txt")
+METRICS = ("nodes", "wall_time", "peak_rss_kb")
+
+
+def make_corpus(sizes, depths, count, seed):
+    """
+    Generate a reproducible corpus of solvable puzzles for every size and scramble depth.
+
+    Args:
+        sizes (List[int]): The puzzle sizes.
+        depths (List[int]): The number of random moves scrambling each puzzle.
+        count (int): The number of puzzles for each size and depth.
+        seed (str): The seed of the corpus, each size and depth gets its own stream from it.
+
+    Returns:
+        List[dict]: The puzzles, with their name, size, depth and board.
+    """
+    corpus = []
+    for size in sizes:
+        for depth in depths:
+            random.seed("%s-%i-%i" % (seed, size, depth))
+            for i in range(count):
+                tiles = make_puzzle(size, solvable=True, iterations=depth)
+                board = [tiles[y * size:(y + 1) * size] for y in range(size)]
+                corpus.append({"name": "%ix%i-d%i-%i" % (size, size, depth, i), "size": size, "depth": depth,
+                               "board": board})
+    return corpus
+
+
+def load_korf(filepath):
+    """
+    Load 15-puzzle instances in Korf's format, remapped to the snail goal.
+
+    Each non-empty line holds 16 tiles in row-major order, optionally preceded by
+    the instance number, for the goal with the blank first and tiles 1 to 15 in
+    order. Every tile is renamed after the snail goal tile of the same goal cell,
+    except the blank, which stays the blank, and the tile whose goal is the snail
+    blank cell, which takes the name of the snail tile of the first cell. Both
+    goals then only differ by that tile and the blank, so every instance stays
+    solvable, but the optimal lengths are not Korf's published ones.
+
+    Args:
+        filepath (str): Path to the instances file.
+
+    Returns:
+        List[dict]: The puzzles, with their name, size, depth and board.
+    """
+    snail = Puzzle(4).goal_array.ravel().tolist()
+    names = list(snail)
+    names[0], names[snail.index(0)] = 0, snail[0]
+    corpus = []
+    with open(filepath, "r") as korf_file:
+        for line in korf_file:
+            tiles = [int(token) for token in line.split("#")[0].split()]
+            if not tiles:
+                continue
+            number = tiles.pop(0) if len(tiles) == 17 else len(corpus) + 1
+            remapped = [names[tile] for tile in tiles]
+            corpus.append({"name": "korf-%i" % number, "size": 4, "depth": None,
+                           "board": [remapped[y * 4:(y + 1) * 4] for y in range(4)]})
+    return corpus
+
+
+def run_benchmark(corpus, algorithms, heuristics, timeout):
+    """
+    Solve every puzzle of the corpus with every algorithm and heuristic combination.
+
+    Each run happens in its own process, so its peak RSS is not hidden by the
+    previous runs and it can be stopped at the timeout.
+
+    Args:
+        corpus (List[dict]): The puzzles.
+        algorithms (List[str]): The search algorithms.
+        heuristics (List[str]): The heuristics, 'uniform' or names joined by '+'.
+        timeout (float): Time limit in seconds for each run.
+
+    Returns:
+        List[dict]: The result of every run.
+    """
+    runs = []
+    for algorithm in algorithms:
+        for heuristic in heuristics:
+            for puzzle in corpus:
+                run = {"puzzle": puzzle["name"], "size": puzzle["size"], "depth": puzzle["depth"],
+                       "algorithm": algorithm, "heuristic": heuristic}
+                run.update(_run_in_process(puzzle["board"], algorithm, heuristic, timeout))
+                runs.append(run)
+                print("%-16s %-14s %-18s %s" % (puzzle["name"], algorithm, heuristic, run["status"]),
+                      file=sys.stderr)
+    return runs
+
+
+def check_bounded(corpus, max_open_values, timeout):
+    """
+    Check that A* with a bounded open list finds paths as short as the unbounded A*.
+
+    Args:
+        corpus (List[dict]): The puzzles.
+        max_open_values (List[int]): The open list sizes to check.
+        timeout (float): Time limit in seconds for each run.
+
+    Returns:
+        int: The number of runs whose number of moves differs from the unbounded A*.
+    """
+    mismatches = []
+    for puzzle in corpus:
+        reference = _run_in_process(puzzle["board"], "astar", "manhattan+linear", timeout)
+        if reference["status"] != "solved":
+            print("%-16s skipped, the unbounded A* %s" % (puzzle["name"], reference["status"]), file=sys.stderr)
+            continue
+        for max_open in max_open_values:
+            run = _run_in_process(puzzle["board"], "astar", "manhattan+linear", timeout, max_open)
+            moves = run.get("moves", run["status"])
+            if moves != reference["moves"]:
+                mismatches.append("%s --max-open %i: %s, the unbounded A* found %i moves"
+                                  % (puzzle["name"], max_open, moves, reference["moves"]))
+            print("%-16s --max-open %-8i %s" % (puzzle["name"], max_open, moves), file=sys.stderr)
+
+    print("%i mismatch(es)" % len(mismatches))
+    for mismatch in mismatches:
+        print("  " + mismatch)
+    return len(mismatches)
+
+
+def _run_in_process(board, algorithm, heuristic, timeout, max_open=None):
+    """
+    Solve a board in a child process.
+
+    Args:
+        board (List[List[int]]): The board.
+        algorithm (str): The search algorithm.
+        heuristic (str): The heuristic, 'uniform' or names joined by '+'.
+        timeout (float): Time limit in seconds.
+        max_open (int, optional): Maximum number of states in the A* open list, unbounded if not given.
+
+    Returns:
+        dict: The metrics of the run.
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=_solve_child, args=(board, algorithm, heuristic, sender, max_open))
+    start = timer.perf_counter()
+    process.start()
+    sender.close()
+    if receiver.poll(timeout):
+        result = receiver.recv()
+    else:
+        result = {"status": "timeout"}
+    process.kill()
+    process.join()
+    result["wall_time"] = round(timer.perf_counter() - start, 6)
+    return result
+
+
+def _solve_child(board, algorithm, heuristic, connection, max_open=None):
+    """
+    Solve a board and send its metrics back to the parent process.
+
+    Args:
+        board (List[List[int]]): The board.
+        algorithm (str): The search algorithm.
+        heuristic (str): The heuristic, 'uniform' or names joined by '+'.
+        connection (multiprocessing.connection.Connection): The connection to the parent process.
+        max_open (int, optional): Maximum number of states in the A* open list, unbounded if not given.
+    """
+    uniform = heuristic == "uniform"
+    try:
+        solver = get_solver(None if uniform else heuristic.split("+"), algorithm, uniform, max_open=max_open)
+        result = solver.solve(board)
+        metrics = {
+            "status": "solved",
+            "moves": len(result.moves),
+            "nodes": result.time,
+            "space": result.space,
+            "search_time": round(result.search_time, 6),
+            "nodes_per_sec": round(result.time / result.search_time) if result.search_time else None,
+        }
+    except (PuzzleError, ValueError) as e:
+        metrics = {"status": "error", "error": str(e)}
+    metrics["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    connection.send(metrics)
+    connection.close()
+
+
+def measure_startup(repeat):
+    """
+    Measure the startup time of the command-line solver on a 3x3 board that is already solved.
+
+    Every launch imports the solver and builds its tables, so on such a board the
+    wall time of main.py is its startup cost. The fastest of the launches is kept,
+    as the others only add the noise of the machine.
+
+    Args:
+        repeat (int): The number of launches.
+
+    Returns:
+        dict: The fastest wall time of a launch, in seconds.
+    """
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "srcs", "main.py")
+    goal = Puzzle(3).goal_array
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as board_file:
+        board_file.write("3\n" + "\n".join(" ".join(str(tile) for tile in row) for row in goal) + "\n")
+    try:
+        times = []
+        for _ in range(repeat):
+            start = timer.perf_counter()
+            subprocess.run([sys.executable, main_path, board_file.name], stdout=subprocess.DEVNULL, check=True)
+            times.append(timer.perf_counter() - start)
+    finally:
+        os.remove(board_file.name)
+    return {"wall_time": round(min(times), 6)}
+
+
+def summarize(runs):
+    """
+    Aggregate the runs by corpus, algorithm and heuristic.
+
+    Args:
+        runs (List[dict]): The result of every run.
+
+    Returns:
+        dict: The aggregated metrics, keyed by 'corpus algorithm heuristic'.
+    """
+    groups = {}
+    for run in runs:
+        corpus = run["puzzle"].rsplit("-", 1)[0]
+        groups.setdefault("%s %s %s" % (corpus, run["algorithm"], run["heuristic"]), []).append(run)
+
+    summary = {}
+    for key, group in groups.items():
+        solved = [run for run in group if run["status"] == "solved"]
+        search_time = sum(run["search_time"] for run in solved)
+        summary[key] = {
+            "solved": len(solved),
+            "total": len(group),
+            "nodes": sum(run["nodes"] for run in solved),
+            "nodes_per_sec": round(sum(run["nodes"] for run in solved) / search_time) if search_time else None,
+            "peak_rss_kb": max((run["peak_rss_kb"] for run in group if "peak_rss_kb" in run), default=None),
+            "wall_time": round(sum(run["wall_time"] for run in group), 6),
+        }
+    return summary
+
+
+def print_summary(summary):
+    """
+    Print the aggregated metrics as a table.
+
+    Args:
+        summary (dict): The aggregated metrics.
+    """
+    print("%-40s %9s %12s %12s %12s %10s" % ("corpus algorithm heuristic", "solved", "nodes", "nodes/sec",
+                                              "peak RSS kB", "wall (s)"))
+    for key, row in sorted(summary.items()):
+        print("%-40s %9s %12i %12s %12s %10.2f" % (key, "%i/%i" % (row["solved"], row["total"]), row["nodes"],
+                                                  row["nodes_per_sec"], row["peak_rss_kb"], row["wall_time"]))
+
+
+def compare(old_path, new_path, threshold):
+    """
+    Compare two benchmark result files and print the regressions.
+
+    A regression is a puzzle that is no longer solved or gets a different number
+    of moves, or a combination whose nodes, wall time or peak RSS grew by more
+    than the threshold, or a startup time that grew by more than the threshold.
+
+    Args:
+        old_path (str): Path to the reference results.
+        new_path (str): Path to the new results.
+        threshold (float): Relative growth allowed before flagging a regression.
+
+    Returns:
+        int: The number of regressions.
+    """
+    with open(old_path) as old_file, open(new_path) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+
+    regressions = []
+    old_runs = {(run["puzzle"], run["algorithm"], run["heuristic"]): run for run in old["runs"]}
+    for run in new["runs"]:
+        reference = old_runs.get((run["puzzle"], run["algorithm"], run["heuristic"]))
+        if reference is None or reference["status"] != "solved":
+            continue
+        if run["status"] != "solved":
+            regressions.append("%s %s %s: %s, was solved" % (run["puzzle"], run["algorithm"], run["heuristic"],
+                                                             run["status"]))
+        elif run["moves"] != reference["moves"]:
+            regressions.append("%s %s %s: %i moves, was %i" % (run["puzzle"], run["algorithm"], run["heuristic"],
+                                                               run["moves"], reference["moves"]))
+
+    old_summary, new_summary = summarize(old["runs"]), summarize(new["runs"])
+    # Results written before startup was measured have no startup entry
+    if old.get("startup") and new.get("startup"):
+        old_summary["startup"], new_summary["startup"] = old["startup"], new["startup"]
+    print("%-40s %-12s %14s %14s %9s" % ("corpus algorithm heuristic", "metric", "old", "new", "change"))
+    for key in sorted(set(old_summary) & set(new_summary)):
+        for metric in METRICS:
+            if metric not in old_summary[key] or metric not in new_summary[key]:
+                continue
+            before, after = old_summary[key][metric], new_summary[key][metric]
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append("%s: %s %+.1f%%" % (key, metric, 100 * change))
+            print("%-40s %-12s %14s %14s %+8.1f%%%s" % (key, metric, before, after, 100 * change, flag))
+
+    print("\n%i regression(s)" % len(regressions))
+    for regression in regressions:
+        print("  " + regression)
+    return len(regressions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="* npuzzle solver benchmarks *")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write the results as JSON")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[3, 4], help="puzzle sizes")
+    run_parser.add_argument("--depths", type=int, nargs="+", default=[20, 40, 80], help="scramble depths")
+    run_parser.add_argument("--count", type=int, default=10, help="puzzles for each size and depth")
+    run_parser.add_argument("--seed", default="npuzzle", help="seed of the generated corpus")
+    run_parser.add_argument("--korf", default=KORF_FILE,
+                            help="file of Korf's 15-puzzle instances to add to the corpus (default: korf100.txt "
+                                 "next to this script)")
+    run_parser.add_argument("--no-korf", action="store_true", help="leave Korf's instances out of the corpus")
+    run_parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=ALGORITHMS)
+    run_parser.add_argument("--heuristics", nargs="+", default=list(HEURISTICS),
+                            help="'uniform', or heuristic names joined by '+' (default: %s)" % " ".join(HEURISTICS))
+    run_parser.add_argument("--timeout", type=float, default=60, help="time limit in seconds for each run")
+    run_parser.add_argument("--startup-runs", type=int, default=5,
+                            help="launches of main.py timing its startup, 0 to skip (default: 5)")
+    run_parser.add_argument("--output", "-o", default="benchmark.json", help="results file")
+
+    compare_parser = commands.add_parser("compare", help="compare two results files and flag regressions")
+    compare_parser.add_argument("old", help="reference results file")
+    compare_parser.add_argument("new", help="new results file")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative growth allowed before flagging a regression (default: 0.1)")
+
+    check_parser = commands.add_parser("check-bounded",
+                                       help="check that a bounded A* open list finds the shortest paths")
+    check_parser.add_argument("--size", type=int, default=3, help="puzzle size")
+    check_parser.add_argument("--count", type=int, default=40, help="number of random solvable puzzles")
+    check_parser.add_argument("--seed", type=int, default=7, help="seed of the random puzzles")
+    check_parser.add_argument("--max-open", type=int, nargs="+", default=[20, 200], help="open list sizes")
+    check_parser.add_argument("--timeout", type=float, default=60, help="time limit in seconds for each run")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        sys.exit(1 if compare(args.old, args.new, args.threshold) else 0)
+    if args.command == "check-bounded":
+        boards = random_boards(args.size, args.count, seed=args.seed).tolist()
+        corpus = [{"name": "random-%ix%i-%i" % (args.size, args.size, i), "board": board}
+                  for i, board in enumerate(boards)]
+        sys.exit(1 if check_bounded(corpus, args.max_open, args.timeout) else 0)
+
+    corpus = make_corpus(args.sizes, args.depths, args.count, args.seed)
+    if not args.no_korf:
+        if os.path.exists(args.korf):
+            corpus += load_korf(args.korf)
+        elif args.korf != KORF_FILE:
+            parser.error("Korf's instances file %s does not exist." % args.korf)
+        else:
+            print("Warning: %s is missing, Korf's instances are left out of the corpus." % KORF_FILE,
+                  file=sys.stderr)
+    runs = run_benchmark(corpus, args.algorithms, args.heuristics, args.timeout)
+    startup = measure_startup(args.startup_runs) if args.startup_runs > 0 else None
+
+    meta = {key: value for key, value in vars(args).items() if key != "command"}
+    meta.update(python=platform.python_version(), machine=platform.machine(),
+                date=timer.strftime("%Y-%m-%dT%H:%M:%S"))
+    summary = summarize(runs)
+    with open(args.output, "w") as output:
+        json.dump({"meta": meta, "summary": summary, "startup": startup, "runs": runs}, output, indent=1)
+    print_summary(summary)
+    if startup is not None:
+        print("\nstartup: %.3f s" % startup["wall_time"])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 #!/usr/bin/env python
 
+import os
 import sys
 import argparse
 import random
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "srcs"))
+
+from Generator import random_boards, scrambled_boards
+
 def make_puzzle(s, solvable, iterations):
 	def swap_empty(p):
 		idx = p.index(0)
@@ -12,9 +17,9 @@ def make_puzzle(s, solvable, iterations):
 			poss.append(idx - 1)
 		if idx % s < s - 1:
 			poss.append(idx + 1)
-		if idx / s > 0 and idx - s >= 0:
+		if idx // s > 0 and idx - s >= 0:
 			poss.append(idx - s)
-		if idx / s < s - 1:
+		if idx // s < s - 1:
 			poss.append(idx + s)
 		swi = random.choice(poss)
 		p[idx] = p[swi]
@@ -64,18 +69,29 @@ if __name__ == "__main__":
 	parser.add_argument("size", type=int, help="Size of the puzzle's side. Must be >3.")
 	parser.add_argument("-s", "--solvable", action="store_true", default=False, help="Forces generation of a solvable puzzle. Overrides -u.")
 	parser.add_argument("-u", "--unsolvable", action="store_true", default=False, help="Forces generation of an unsolvable puzzle")
-	parser.add_argument("-i", "--iterations", type=int, default=10000, help="Number of passes")
+	parser.add_argument("-i", "--iterations", type=int, help="Number of passes of a random walk, instead of sampling a random board directly")
+	parser.add_argument("-d", "--depth", type=int, help="Scramble with exactly this many moves, never undoing the previous one. Always solvable.")
+	parser.add_argument("-c", "--count", type=int, default=1, help="Number of puzzles, printed one after the other")
+	parser.add_argument("--seed", help="Seed of the random generator, for reproducible puzzles")
 
 	args = parser.parse_args()
 
-	random.seed()
+	random.seed(args.seed)
 
 	if args.solvable and args.unsolvable:
-		print "Can't be both solvable AND unsolvable, dummy !"
+		print("Can't be both solvable AND unsolvable, dummy !")
 		sys.exit(1)
 
 	if args.size < 3:
-		print "Can't generate a puzzle with size lower than 2. It says so in the help. Dummy."
+		print("Can't generate a puzzle with size lower than 2. It says so in the help. Dummy.")
+		sys.exit(1)
+
+	if args.count < 1 or (args.depth is not None and args.depth < 0):
+		print("The count must be positive and the depth can't be negative.")
+		sys.exit(1)
+
+	if args.depth is not None and args.unsolvable:
+		print("A scramble is always solvable, dummy !")
 		sys.exit(1)
 
 	if not args.solvable and not args.unsolvable:
@@ -87,12 +103,19 @@ if __name__ == "__main__":
 
 	s = args.size
 
-	puzzle = make_puzzle(s, solvable=solv, iterations=args.iterations)
+	if args.depth is not None:
+		solv = True
+		puzzles = scrambled_boards(s, args.count, args.depth, seed=random.getrandbits(64)).reshape(args.count, -1).tolist()
+	elif args.iterations is not None:
+		puzzles = [make_puzzle(s, solvable=solv, iterations=args.iterations) for _ in range(args.count)]
+	else:
+		puzzles = random_boards(s, args.count, seed=random.getrandbits(64), solvable=solv).reshape(args.count, -1).tolist()
 
 	w = len(str(s*s))
-	print "# This puzzle is %s" % ("solvable" if solv else "unsolvable")
-	print "%d" % s
-	for y in range(s):
-		for x in range(s):
-			print "%s" % (str(puzzle[x + y*s]).rjust(w)),
-		print
+	lines = []
+	for puzzle in puzzles:
+		lines.append("# This puzzle is %s" % ("solvable" if solv else "unsolvable"))
+		lines.append("%d" % s)
+		for y in range(s):
+			lines.append(" ".join(str(puzzle[x + y*s]).rjust(w) for x in range(s)))
+	sys.stdout.write("\n".join(lines) + "\n")
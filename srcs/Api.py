@@ -0,0 +1,109 @@
+from Errors import PuzzleError, MalformedPuzzleError, UnsolvablePuzzleError, BudgetExceededError
+from Parser import Parser, ALGORITHMS, validate_board
+from Puzzle import is_solvable
+from SolveResult import SolveResult
+from Solver import Solver
+
+HEURISTICS = ("misplaced", "manhattan", "linear", "pdb", "walking")
+
+# Solvers are kept across calls, so their goal and heuristic tables stay loaded
+_solvers = {}
+
+
+def solve(board, heuristic=None, algorithm="astar", uniform=False, weight=1.0, deadline=None, large=False, cache=False,
+          max_nodes=None, max_time=None, max_open=None):
+    """
+    Solve a puzzle board and return the result, without printing or exiting.
+
+    Args:
+        board (List[List[int]] | numpy.ndarray): The start board, a square grid of tiles with 0 as the empty cell.
+        heuristic (str | Iterable[str], optional): One or more of 'misplaced', 'manhattan', 'linear', 'pdb'
+            and 'walking'. Defaults to Manhattan distance with linear conflict.
+        algorithm (str, optional): One of the search algorithms of the --algorithm option. Defaults to 'astar'.
+        uniform (bool, optional): Search with no heuristic, only the cost.
+        weight (float, optional): Weight of the heuristic, the path is at most this many times longer than
+            the shortest one. Defaults to 1, the shortest path.
+        deadline (float, optional): Time budget in seconds of the 'anytime' algorithm.
+        large (bool, optional): Solve boards larger than 3x3 side by side with scripted moves,
+            in polynomial time but not along the shortest path.
+        cache (bool, optional): Reuse the solutions of boards, or of their symmetric boards, solved before
+            with the same options, from a memory cache and an on-disk cache.
+        max_nodes (int, optional): Node budget, the search stops once it expanded more states than this.
+        max_time (float, optional): Time budget in seconds, the search stops once it ran longer than this.
+        max_open (int, optional): Maximum number of states in the A* open list, the worst ones are pruned beyond it.
+
+    Returns:
+        SolveResult: The moves, counters and timings of the solution.
+
+    Raises:
+        MalformedPuzzleError: If the board is not a well-formed n x n puzzle.
+        UnsolvablePuzzleError: If the board is rejected by a validation stage or cannot reach the goal.
+        BudgetExceededError: If the search exceeds its node or time budget.
+        ValueError: If the options are not valid or not supported for this board.
+    """
+    matrix = validate_board(board)
+    return get_solver(heuristic, algorithm, uniform, weight, deadline, large, cache, max_nodes, max_time,
+                      max_open).solve(matrix)
+
+
+def get_solver(heuristic=None, algorithm="astar", uniform=False, weight=1.0, deadline=None, large=False, cache=False,
+               max_nodes=None, max_time=None, max_open=None):
+    """
+    Get the solver for the given options, creating it on first use.
+
+    Args:
+        heuristic (str | Iterable[str], optional): One or more of 'misplaced', 'manhattan', 'linear', 'pdb'
+            and 'walking'.
+        algorithm (str, optional): One of the search algorithms of the --algorithm option.
+        uniform (bool, optional): Search with no heuristic, only the cost.
+        weight (float, optional): Weight of the heuristic, at least 1.
+        deadline (float, optional): Time budget in seconds of the 'anytime' algorithm.
+        large (bool, optional): Solve boards larger than 3x3 side by side with scripted moves.
+        cache (bool, optional): Reuse the solutions of boards solved before.
+        max_nodes (int, optional): Node budget of the search.
+        max_time (float, optional): Time budget of the search in seconds.
+        max_open (int, optional): Maximum number of states in the A* open list.
+
+    Returns:
+        Solver: The solver for these options.
+
+    Raises:
+        ValueError: If the options are not valid.
+    """
+    if heuristic is None:
+        heuristics = ("manhattan", "linear")
+    elif isinstance(heuristic, str):
+        heuristics = (heuristic,)
+    else:
+        heuristics = tuple(heuristic)
+    for name in heuristics:
+        if name not in HEURISTICS:
+            raise ValueError("Unknown heuristic '%s', expected one of %s." % (name, ", ".join(HEURISTICS)))
+
+    key = (frozenset(heuristics), algorithm, bool(uniform), weight, deadline, bool(large), bool(cache), max_nodes,
+           max_time, max_open)
+    if key not in _solvers:
+        if algorithm not in ALGORITHMS:
+            raise ValueError("Unknown algorithm '%s', expected one of %s." % (algorithm, ", ".join(ALGORITHMS)))
+        if weight < 1:
+            raise ValueError("The heuristic weight must be at least 1.")
+        if max_nodes is not None and max_nodes < 1:
+            raise ValueError("The node budget must be at least 1.")
+        if max_time is not None and max_time <= 0:
+            raise ValueError("The time budget must be positive.")
+        if max_open is not None and max_open < 1:
+            raise ValueError("The open list needs room for at least 1 state.")
+        args = Parser().parser.parse_args([])
+        for name in HEURISTICS:
+            setattr(args, name, name in heuristics)
+        args.algorithm = algorithm
+        args.uniform = bool(uniform)
+        args.weight = float(weight)
+        args.deadline = deadline
+        args.large = bool(large)
+        args.cache = bool(cache)
+        args.max_nodes = max_nodes
+        args.max_time = max_time
+        args.max_open = max_open
+        _solvers[key] = Solver(args)
+    return _solvers[key]
@@ -0,0 +1,132 @@
+import os
+import sys
+import glob
+import json
+import signal
+import time as timer
+from concurrent.futures import ProcessPoolExecutor
+from Errors import UnsolvablePuzzleError, BudgetExceededError
+from Parser import parse_puzzles
+from Solver import Solver
+
+# Each worker process keeps its own solver, so goal and heuristic tables are built once per worker
+_solver = None
+
+
+class PuzzleTimeout(Exception):
+    pass
+
+
+def run_batch(args):
+    """
+    Solve every puzzle of a directory, a glob pattern or a multi-puzzle file with a process pool.
+
+    One JSON line is written per puzzle, in input order, with its status, number
+    of moves, suboptimality bound, time and space complexity and wall-clock time,
+    the reason a rejected board failed validation, and the report of the search
+    stats in stats mode.
+
+    Args:
+        args: Command-line arguments.
+    """
+    output = open(args.output, "w") if args.output else sys.stdout
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args,)) as executor:
+            for result in executor.map(_solve_job, iter_jobs(args.filepath)):
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def iter_jobs(pattern):
+    """
+    Generate the batch jobs of a directory, a glob pattern or a multi-puzzle file.
+
+    Args:
+        pattern (str): A directory, a glob pattern or a file path.
+
+    Yields:
+        Tuple: The puzzle name, size, board and parsing error (None if parsed).
+    """
+    if os.path.isdir(pattern):
+        paths = sorted(os.path.join(pattern, name) for name in os.listdir(pattern))
+        paths = [path for path in paths if os.path.isfile(path)]
+    elif os.path.isfile(pattern):
+        paths = [pattern]
+    else:
+        paths = sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+    for path in paths:
+        index = 0
+        try:
+            # Malformed puzzles are reported on their own line, the rest of the file is still solved
+            for puzzle_size, start_state, error in parse_puzzles(path):
+                yield "%s:%i" % (path, index), puzzle_size, start_state, error and str(error)
+                index += 1
+        except Exception as e:
+            yield "%s:%i" % (path, index), None, None, str(e) or type(e).__name__
+
+
+def _init_worker(args):
+    """
+    Initialize a worker process with its own solver and the per-puzzle timeout handler.
+
+    Args:
+        args: Command-line arguments.
+    """
+    global _solver
+    args.verbose = False
+    _solver = Solver(args)
+    if args.timeout and hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+
+def _raise_timeout(signum, frame):
+    raise PuzzleTimeout()
+
+
+def _solve_job(job):
+    """
+    Solve a single batch job in a worker process.
+
+    Args:
+        job (Tuple): The puzzle name, size, board and parsing error.
+
+    Returns:
+        dict: The result of the job.
+    """
+    name, puzzle_size, board, error = job
+    result = {"puzzle": name}
+    if error is not None:
+        result.update(status="error", error=error)
+        return result
+
+    timeout = _solver.args.timeout if hasattr(signal, "setitimer") else None
+    start = timer.perf_counter()
+    try:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        solution = _solver.solve(board)
+        result.update(status="solved", moves=len(solution.moves), time=solution.time, space=solution.space,
+                      bound=solution.bound)
+        if solution.stats is not None:
+            result["stats"] = solution.stats
+    except UnsolvablePuzzleError as e:
+        result.update(status="unsolvable", reason=str(e))
+        if _solver.stats is not None:
+            result["stats"] = _solver.stats.report()
+    except BudgetExceededError as e:
+        result.update(status="budget_exceeded", error=str(e))
+        if _solver.stats is not None:
+            result["stats"] = _solver.stats.report()
+    except PuzzleTimeout:
+        result.update(status="timeout")
+    except Exception as e:
+        result.update(status="error", error=str(e) or type(e).__name__)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result["wall_clock"] = round(timer.perf_counter() - start, 6)
+    return result
@@ -0,0 +1,22 @@
+class PuzzleError(Exception):
+    """
+    Base class of the errors raised for a puzzle that cannot be solved as given.
+    """
+
+
+class MalformedPuzzleError(PuzzleError):
+    """
+    Raised when the input is not a well-formed n x n puzzle.
+    """
+
+
+class UnsolvablePuzzleError(PuzzleError):
+    """
+    Raised when the puzzle cannot reach the goal state.
+    """
+
+
+class BudgetExceededError(PuzzleError):
+    """
+    Raised when the search expands more states or runs longer than its budget allows.
+    """
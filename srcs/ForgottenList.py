@@ -0,0 +1,63 @@
+import heapq
+
+
+class ForgottenList:
+    def __init__(self):
+        """
+        Initialize the ForgottenList object.
+
+        Holds the expanded nodes that have children evicted from a bounded open
+        list, each with the lowest f-value of its evicted children. Such a node is
+        expanded again once that f-value is the lowest of the search, which
+        regenerates the forgotten children. A node queued again with a lower
+        f-value keeps only that one, the older heap entry is skipped when popped.
+        """
+        self.heap = []
+        self.f_values = {}
+
+    def __len__(self):
+        return len(self.f_values)
+
+    def add(self, index, f):
+        """
+        Back up the f-value of an evicted child to its parent.
+
+        Args:
+            index (int): The parent node.
+            f (int | float): The priority of the evicted child.
+        """
+        if f < self.f_values.get(index, float("inf")):
+            self.f_values[index] = f
+            heapq.heappush(self.heap, (f, index))
+
+    def peek_f(self):
+        """
+        Get the lowest backed-up f-value.
+
+        Returns:
+            int | float: The lowest f-value, or None if no node is queued.
+        """
+        self._skip_stale()
+        return self.heap[0][0] if self.heap else None
+
+    def pop(self):
+        """
+        Pop the node with the lowest backed-up f-value.
+
+        Returns:
+            int: The node, or None if no node is queued.
+        """
+        self._skip_stale()
+        if not self.heap:
+            return None
+        _, index = heapq.heappop(self.heap)
+        del self.f_values[index]
+        return index
+
+    def _skip_stale(self):
+        """
+        Drop the heap entries of nodes popped or queued again with a lower f-value since.
+        """
+        heap = self.heap
+        while heap and self.f_values.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
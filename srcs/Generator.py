@@ -0,0 +1,104 @@
+import numpy as np
+from Puzzle import _puzzle_for_size
+
+# Boards generated together, bounding the memory of the vectorized passes
+CHUNK_SIZE = 1 << 16
+
+
+def random_boards(size, count, seed=None, solvable=True):
+    """
+    Sample boards uniformly among the solvable (or unsolvable) boards of the snail goal.
+
+    Each board is a random permutation of the tiles, drawn for all the boards
+    at once. The boards of the wrong parity get two tiles swapped, always the
+    first two cells, or the last two when the first two hold the zero tile.
+    For a given zero cell this swap maps the boards of one parity one-to-one
+    onto the other, so the result stays uniform.
+
+    Args:
+        size (int): The size of the puzzle grid.
+        count (int): The number of boards.
+        seed (int | numpy.random.Generator, optional): The seed of the random generator, for reproducible boards.
+        solvable (bool, optional): Whether the boards can reach the goal.
+
+    Returns:
+        numpy.ndarray: The boards, stacked in a (count, size, size) array.
+    """
+    rng = np.random.default_rng(seed)
+    puzzle = _puzzle_for_size(size)
+    cells = size * size
+    boards = np.empty((count, cells), dtype=np.uint16)
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = boards[start:start + CHUNK_SIZE]
+        chunk[:] = rng.permuted(np.broadcast_to(np.arange(cells, dtype=np.uint16), chunk.shape), axis=1)
+        wrong = _is_solvable_batch(puzzle, chunk) != solvable
+        rows = np.flatnonzero(wrong)
+        first = np.where((chunk[rows, 0] == 0) | (chunk[rows, 1] == 0), cells - 2, 0)
+        chunk[rows, first], chunk[rows, first + 1] = chunk[rows, first + 1], chunk[rows, first]
+    return boards.reshape(count, size, size)
+
+
+def scrambled_boards(size, count, depth, seed=None):
+    """
+    Scramble boards from the goal with exactly depth random moves, none undoing the previous one.
+
+    The walks of all the boards advance together, one move per step. The
+    shortest solution of a board can still be shorter than its depth, when
+    the walk closes a longer cycle.
+
+    Args:
+        size (int): The size of the puzzle grid.
+        count (int): The number of boards.
+        depth (int): The number of moves of each scramble.
+        seed (int | numpy.random.Generator, optional): The seed of the random generator, for reproducible boards.
+
+    Returns:
+        numpy.ndarray: The boards, stacked in a (count, size, size) array.
+    """
+    rng = np.random.default_rng(seed)
+    puzzle = _puzzle_for_size(size)
+    # Neighbouring cells of every cell, padded with -1
+    neighbours = np.full((size * size, 4), -1, dtype=np.intp)
+    for cell, cells in enumerate(puzzle.neighbours):
+        neighbours[cell, :len(cells)] = cells
+
+    boards = np.empty((count, size * size), dtype=np.uint16)
+    for start in range(0, count, CHUNK_SIZE):
+        chunk = boards[start:start + CHUNK_SIZE]
+        chunk[:] = puzzle.goal_array.ravel()
+        rows = np.arange(len(chunk))
+        zeros = np.full(len(chunk), int(np.flatnonzero(puzzle.goal_array.ravel() == 0)[0]), dtype=np.intp)
+        previous = np.full(len(chunk), -1, dtype=np.intp)
+        for _ in range(depth):
+            candidates = neighbours[zeros]
+            valid = (candidates != -1) & (candidates != previous[:, None])
+            # Index of a random valid candidate, picked by its rank among the valid ones
+            picks = (rng.random(len(chunk)) * valid.sum(axis=1)).astype(np.intp)
+            moves = candidates[rows, np.argmax(valid.cumsum(axis=1) > picks[:, None], axis=1)]
+            chunk[rows, zeros] = chunk[rows, moves]
+            chunk[rows, moves] = 0
+            previous, zeros = zeros, moves
+    return boards.reshape(count, size, size)
+
+
+def _is_solvable_batch(puzzle, boards):
+    """
+    Check which boards can reach the goal, with the criterion of Puzzle.is_solvable.
+
+    The inversion parity is counted pair by pair, one position against all the
+    following ones at a time, over every board at once.
+
+    Args:
+        puzzle (Puzzle): The puzzle object representing the game.
+        boards (numpy.ndarray): The boards, flattened in a (K, N * N) array.
+
+    Returns:
+        numpy.ndarray: True for every board that can be solved.
+    """
+    ranks = puzzle.goal_rank[boards]
+    parity = np.zeros(len(boards), dtype=np.intp)
+    for index in range(ranks.shape[1] - 1):
+        parity += np.count_nonzero(ranks[:, index + 1:] < ranks[:, index, None], axis=1)
+    zero_row, zero_column = np.divmod(np.argmax(boards == 0, axis=1), puzzle.size)
+    center = puzzle.size // 2
+    return (parity + puzzle.size) % 2 != (np.abs(center - zero_column) + np.abs(center - zero_row)) % 2
@@ -1,4 +1,6 @@
 import numpy as np
+from bisect import bisect_left
+from math import isqrt
 
 
 class Heuristic:
@@ -14,13 +16,24 @@ class Heuristic:
         Returns:
             int: The number of misplaced tiles.
         """
-        h = 0
-        for y, _ in enumerate(matrix):
-            for x, _ in enumerate(matrix[y]):
-                num = matrix[y][x]
-                if num and (y, x) != goal[num]:
-                    h += 1
-        return h
+        goal_array = np.zeros_like(matrix)
+        for tile, (y, x) in enumerate(goal):
+            goal_array[y, x] = tile
+        return int(Heuristic.misplaced_tiles_batch(np.asarray(matrix)[None], goal_array)[0])
+
+    @staticmethod
+    def misplaced_tiles_batch(boards, goal_array):
+        """
+        Calculate the number of misplaced tiles heuristic of many boards in one vectorized pass.
+
+        Args:
+            boards (numpy.ndarray): The boards, stacked in a (K, N, N) array.
+            goal_array (numpy.ndarray): The goal matrix.
+
+        Returns:
+            numpy.ndarray: The number of misplaced tiles of each board.
+        """
+        return np.count_nonzero((boards != goal_array) & (boards != 0), axis=(1, 2))
 
     @staticmethod
     def misplaced_tile_single(state, goal):
@@ -28,7 +41,7 @@ class Heuristic:
         Calculate the number of misplaced tiles heuristic for a single tile.
 
         Args:
-            state (State): The current state.
+            state (State | PackedState): The current state.
             goal (dict): The goal state dictionary.
 
         Returns:
@@ -37,7 +50,7 @@ class Heuristic:
         h = state.parent.h_misplaced
 
         y, x = state.parent.zero_tile
-        tile = state.matrix[y][x]
+        tile = state.tile_at(y, x)
         y2, x2 = goal[tile]
         h += (y, x) != (y2, x2)
 
@@ -58,22 +71,38 @@ class Heuristic:
         Returns:
             int: The Manhattan distance.
         """
-        h = 0
-        for y, _ in enumerate(matrix):
-            for x, _ in enumerate(matrix[y]):
-                if matrix[y][x]:
-                    y2, x2 = goal[matrix[y][x]]
-                    h += abs(x - x2) + abs(y - y2)
-        return h
+        return int(Heuristic.manhattan_distance_batch(np.asarray(matrix)[None], np.array(goal))[0])
 
     @staticmethod
-    def manhattan_dist_single(state, goal):
+    def manhattan_distance_batch(boards, goal_coordinates):
+        """
+        Calculate the Manhattan distance heuristic of many boards in one vectorized pass.
+
+        Args:
+            boards (numpy.ndarray): The boards, stacked in a (K, N, N) array.
+            goal_coordinates (numpy.ndarray): The goal row and column of every tile, in a (N * N, 2) array.
+
+        Returns:
+            numpy.ndarray: The Manhattan distance of each board.
+        """
+        size = boards.shape[-1]
+        tiles = boards.reshape(len(boards), size * size)
+        rows, columns = np.divmod(np.arange(size * size), size)
+        goal = goal_coordinates[tiles]
+        distance = np.abs(goal[..., 0] - rows) + np.abs(goal[..., 1] - columns)
+        return np.where(tiles != 0, distance, 0).sum(axis=1)
+
+    @staticmethod
+    def manhattan_dist_single(state, puzzle):
         """
         Calculate the Manhattan distance heuristic for a single tile.
 
+        The change of distance of the moved tile is read from the Manhattan delta
+        table of the puzzle, and only computed for boards too large for that table.
+
         Args:
-            state (State): The current state.
-            goal (dict): The goal state dictionary.
+            state (State | PackedState): The current state.
+            puzzle (Puzzle): The puzzle object representing the game.
 
         Returns:
             int: The Manhattan distance.
@@ -81,11 +110,183 @@ class Heuristic:
         h = state.parent.h_manhattan
 
         y, x = state.parent.zero_tile
-        tile = state.matrix[y][x]
-        y2, x2 = goal[tile]
+        tile = state.tile_at(y, x)
+        y0, x0 = state.zero_tile
+        delta = puzzle.manhattan_delta
+        if delta is not None:
+            cells = puzzle.size * puzzle.size
+            return h + delta[(int(tile) * cells + y0 * puzzle.size + x0) * cells + y * puzzle.size + x]
+
+        y2, x2 = puzzle.goal[tile]
         h += abs(x - x2) + abs(y - y2)
+        h -= abs(x0 - x2) + abs(y0 - y2)
 
-        y, x = state.zero_tile
-        h -= abs(x - x2) + abs(y - y2)
+        return h
+
+    @staticmethod
+    def linear_conflict(matrix, goal):
+        """
+        Calculate the linear conflict heuristic.
+
+        Two tiles are in linear conflict when they are in their goal row (or column)
+        but in reversed order, so one of them has to leave the line and come back.
+        Each line adds two moves per tile that has to leave it, on top of the
+        Manhattan distance.
+
+        Args:
+            matrix (numpy.ndarray): The current state matrix.
+            goal (dict): The goal state dictionary.
+
+        Returns:
+            int: The linear conflict value.
+        """
+        h = 0
+        for y, row in enumerate(matrix):
+            h += _line_conflicts(row, y, 0, goal)
+        for x, column in enumerate(np.transpose(matrix)):
+            h += _line_conflicts(column, x, 1, goal)
+        return h
+
+    @staticmethod
+    def linear_conflict_single(state, goal):
+        """
+        Calculate the linear conflict heuristic for a single tile move.
+
+        Only the two lines crossed by the moved tile change: its columns on a
+        horizontal move, its rows on a vertical one.
+
+        Args:
+            state (State | PackedState): The current state.
+            goal (dict): The goal state dictionary.
+
+        Returns:
+            int: The linear conflict value.
+        """
+        h = state.parent.h_linear
+        size = isqrt(len(goal))
+
+        y, x = state.parent.zero_tile
+        tile = state.tile_at(y, x)
+        y0, x0 = state.zero_tile
+        if y == y0:
+            entered = [state.tile_at(i, x) for i in range(size)]
+            left = [state.tile_at(i, x0) for i in range(size)]
+            axis, index, index0, pos, pos0 = 1, x, x0, y, y0
+        else:
+            entered = [state.tile_at(y, i) for i in range(size)]
+            left = [state.tile_at(y0, i) for i in range(size)]
+            axis, index, index0, pos, pos0 = 0, y, y0, x, x0
+
+        h += _line_conflicts(entered, index, axis, goal)
+        entered[pos] = 0
+        h -= _line_conflicts(entered, index, axis, goal)
+
+        h += _line_conflicts(left, index0, axis, goal)
+        left[pos0] = tile
+        h -= _line_conflicts(left, index0, axis, goal)
 
         return h
+
+    @staticmethod
+    def pattern_database(matrix, pdb):
+        """
+        Calculate the additive pattern database heuristic.
+
+        Args:
+            matrix (numpy.ndarray): The current state matrix.
+            pdb (PatternDatabase): The pattern database of the puzzle.
+
+        Returns:
+            h (int): The sum of the pattern database values.
+            keys (Tuple[int]): The index of the board in each pattern table.
+        """
+        keys = pdb.keys(matrix)
+        return pdb.lookup(keys), keys
+
+    @staticmethod
+    def pattern_database_single(state, pdb):
+        """
+        Calculate the additive pattern database heuristic for a single tile move.
+
+        Only the table of the pattern containing the moved tile is looked up again.
+
+        Args:
+            state (State | PackedState): The current state.
+            pdb (PatternDatabase): The pattern database of the puzzle.
+
+        Returns:
+            h (int): The sum of the pattern database values.
+            keys (Tuple[int]): The index of the board in each pattern table.
+        """
+        y, x = state.parent.zero_tile
+        tile = state.tile_at(y, x)
+        y0, x0 = state.zero_tile
+        return pdb.update(state.parent.h_pdb, state.parent.pdb_keys, tile, y0 * pdb.size + x0, y * pdb.size + x)
+
+    @staticmethod
+    def walking_distance(matrix, wd):
+        """
+        Calculate the walking distance heuristic.
+
+        Args:
+            matrix (numpy.ndarray): The current state matrix.
+            wd (WalkingDistance): The walking distance tables of the puzzle.
+
+        Returns:
+            h (int): The sum of the vertical and horizontal walking distances.
+            keys (Tuple[int]): The index of the board in the row table and in the column table.
+        """
+        keys = wd.keys(matrix)
+        return wd.lookup(keys), keys
+
+    @staticmethod
+    def walking_distance_single(state, wd):
+        """
+        Calculate the walking distance heuristic for a single tile move.
+
+        Only the table of the axis of the move is looked up again.
+
+        Args:
+            state (State | PackedState): The current state.
+            wd (WalkingDistance): The walking distance tables of the puzzle.
+
+        Returns:
+            h (int): The sum of the vertical and horizontal walking distances.
+            keys (Tuple[int]): The index of the board in the row table and in the column table.
+        """
+        y, x = state.parent.zero_tile
+        tile = state.tile_at(y, x)
+        y0, x0 = state.zero_tile
+        return wd.update(state.parent.h_walking, state.parent.walking_keys, tile, y0 * wd.size + x0, y * wd.size + x)
+
+
+def _line_conflicts(line, index, axis, goal):
+    """
+    Calculate the linear conflict cost of a single row or column.
+
+    The cost is two moves for every tile that has to leave the line, which is the
+    number of tiles whose goal is in the line minus the longest run of them already
+    in goal order.
+
+    Args:
+        line (Iterable[int]): The tiles of the line, in order.
+        index (int): The index of the line.
+        axis (int): 0 for a row, 1 for a column.
+        goal (dict): The goal state dictionary.
+
+    Returns:
+        int: The linear conflict cost of the line.
+    """
+    other = 1 - axis
+    tails = []
+    count = 0
+    for tile in line:
+        if tile and goal[tile][axis] == index:
+            count += 1
+            position = goal[tile][other]
+            i = bisect_left(tails, position)
+            if i == len(tails):
+                tails.append(position)
+            else:
+                tails[i] = position
+    return 2 * (count - len(tails))
@@ -0,0 +1,307 @@
+import heapq
+from collections import deque
+import numpy as np
+from Errors import UnsolvablePuzzleError
+from Puzzle import is_solvable, _puzzle_for_size
+from SolveResult import MOVES, get_moves
+from State import State
+
+# Size of the last region, solved by the search instead of scripted moves
+FINAL_SIZE = 3
+
+
+class LargeSolver:
+    def __init__(self, solver):
+        """
+        Initialize the LargeSolver object.
+
+        Large boards are reduced one line at a time, following the snail goal:
+        the top row, the right column, the bottom row and the left column of the
+        unsolved region, until only a 3x3 region is left. Each line is solved with
+        scripted moves, and that last region is solved optimally by the search
+        of the solver. The path is polynomial in the size, but not the shortest.
+
+        Args:
+            solver (Solver): The solver searching the last region.
+        """
+        self.solver = solver
+        self.time = 0
+        self.space = 0
+
+    def moves(self, matrix):
+        """
+        Generate the moves solving a board, as they are produced.
+
+        Args:
+            matrix (numpy.ndarray): The start board.
+
+        Yields:
+            str: The moves of the zero tile, as 'U', 'D', 'L' or 'R'.
+
+        Raises:
+            UnsolvablePuzzleError: If the board cannot reach the goal.
+        """
+        if not is_solvable(matrix):
+            raise UnsolvablePuzzleError("Can't be solved")
+        self.time, self.space = 0, 0
+        self.size = len(matrix)
+        self.goal = _puzzle_for_size(self.size).goal_array.ravel().tolist()
+        self.board = np.ravel(matrix).tolist()
+        self.cells = [0] * len(self.board)
+        for cell, tile in enumerate(self.board):
+            self.cells[tile] = cell
+        self.locked = bytearray(len(self.board))
+
+        top, bottom, left, right = 0, self.size - 1, 0, self.size - 1
+        side = 0
+        while bottom - top >= FINAL_SIZE or right - left >= FINAL_SIZE:
+            self.region = (top, bottom, left, right)
+            if side == 0:
+                yield from self._solve_line([top * self.size + x for x in range(left, right + 1)])
+                top += 1
+            elif side == 1:
+                yield from self._solve_line([y * self.size + right for y in range(top, bottom + 1)])
+                right -= 1
+            elif side == 2:
+                yield from self._solve_line([bottom * self.size + x for x in range(right, left - 1, -1)])
+                bottom -= 1
+            else:
+                yield from self._solve_line([y * self.size + left for y in range(bottom, top - 1, -1)])
+                left += 1
+            side = (side + 1) % 4
+
+        yield from self._solve_region(top, left)
+
+    def _solve_line(self, line):
+        """
+        Generate the moves placing the goal tiles of a side of the unsolved region, then lock them.
+
+        The tiles are placed one by one along the line. The last two are placed
+        together: the second to last tile is put in the last cell and the last
+        tile right below it, then both are rotated into place. If the last tile
+        is stuck in the corner next to them, the last two tiles are solved by a
+        search restricted to the corner.
+
+        Args:
+            line (List[int]): The cell numbers of the side, from its first to its last cell.
+
+        Yields:
+            str: The moves of the zero tile.
+        """
+        for cell in line[:-2]:
+            yield from self._place(self.goal[cell], cell)
+            self.locked[cell] = 1
+
+        before_last, last = line[-2], line[-1]
+        first_tile, last_tile = self.goal[before_last], self.goal[last]
+        if self.cells[first_tile] != before_last or self.cells[last_tile] != last:
+            inward = self._inward(line)
+            below = last + inward
+            yield from self._place(first_tile, last)
+            self.locked[last] = 1
+            if self.cells[last_tile] in (before_last, before_last + inward):
+                if self.cells[0] != before_last:
+                    self.locked[self.cells[last_tile]] = 1
+                    yield from self._move_zero_to(below)
+                    self.locked[self.cells[last_tile]] = 0
+                self.locked[last] = 0
+                corner = [cell + depth * inward for depth in range(3) for cell in (before_last, last)]
+                yield from self._solve_corner(corner, first_tile, last_tile)
+                self.locked[before_last] = self.locked[last] = 1
+                return
+            yield from self._place(last_tile, below)
+            self.locked[below] = 1
+            yield from self._move_zero_to(before_last)
+            self.locked[last] = self.locked[below] = 0
+            yield from self._step(last)
+            yield from self._step(below)
+        self.locked[before_last] = self.locked[last] = 1
+
+    def _solve_corner(self, corner, first_tile, last_tile):
+        """
+        Generate the moves putting the last two tiles of a line in place, moving the zero tile in a corner only.
+
+        Only the positions of the zero tile and of both tiles are searched, the
+        other tiles of the corner are left wherever they end up.
+
+        Args:
+            corner (List[int]): The cell numbers of the corner, the last two cells of the line first.
+                The zero tile and both tiles must be in it.
+            first_tile (int): The tile of the second to last cell of the line.
+            last_tile (int): The tile of the last cell of the line.
+
+        Yields:
+            str: The moves of the zero tile.
+
+        Raises:
+            RuntimeError: If the tiles cannot be put in place in the corner.
+        """
+        start = (self.cells[0], self.cells[first_tile], self.cells[last_tile])
+        previous = {start: None}
+        queue = deque([start])
+        while queue:
+            positions = queue.popleft()
+            zero, first, last = positions
+            y, x = divmod(zero, self.size)
+            if first == corner[0] and last == corner[1]:
+                path = []
+                while positions != start:
+                    path.append(positions[0])
+                    positions = previous[positions]
+                for cell in reversed(path):
+                    yield from self._step(cell)
+                return
+            for cell in corner:
+                y2, x2 = divmod(cell, self.size)
+                if abs(y2 - y) + abs(x2 - x) == 1:
+                    moved = (cell, zero if first == cell else first, zero if last == cell else last)
+                    if moved not in previous:
+                        previous[moved] = positions
+                        queue.append(moved)
+        raise RuntimeError("Cannot solve the corner of cells %s." % corner)
+
+    def _inward(self, line):
+        """
+        Get the offset of the cell numbers from a side of the unsolved region towards its inside.
+
+        Args:
+            line (List[int]): The cell numbers of the side.
+
+        Returns:
+            int: The cell number offset.
+        """
+        direction = line[1] - line[0]
+        if direction == 1:
+            return self.size
+        if direction == self.size:
+            return -1
+        if direction == -1:
+            return -self.size
+        return 1
+
+    def _place(self, tile, target):
+        """
+        Generate the moves bringing a tile to a cell, without moving the locked tiles.
+
+        The tile follows a shortest path through the unlocked cells, and the zero
+        tile goes around it to the next cell of that path before every step.
+
+        Args:
+            tile (int): The tile to move.
+            target (int): The cell number to move it to.
+
+        Yields:
+            str: The moves of the zero tile.
+        """
+        path = self._path(self.cells[tile], target)
+        for cell in path:
+            self.locked[self.cells[tile]] = 1
+            yield from self._move_zero_to(cell)
+            self.locked[self.cells[tile]] = 0
+            yield from self._step(self.cells[tile])
+
+    def _move_zero_to(self, target):
+        """
+        Generate the moves bringing the zero tile to a cell, without moving the locked tiles.
+
+        Args:
+            target (int): The cell number to move the zero tile to.
+
+        Yields:
+            str: The moves of the zero tile.
+        """
+        for cell in self._path(self.cells[0], target):
+            yield from self._step(cell)
+
+    def _step(self, cell):
+        """
+        Move the zero tile to a neighbouring cell.
+
+        Args:
+            cell (int): The neighbouring cell number.
+
+        Yields:
+            str: The move of the zero tile.
+        """
+        zero = self.cells[0]
+        y, x = divmod(zero, self.size)
+        y2, x2 = divmod(cell, self.size)
+        tile = self.board[cell]
+        self.board[zero], self.board[cell] = tile, 0
+        self.cells[tile], self.cells[0] = zero, cell
+        self.time += 1
+        yield _MOVE_NAMES[(y2 - y, x2 - x)]
+
+    def _path(self, start, target):
+        """
+        Find a shortest path between two cells of the unsolved region, through the unlocked cells.
+
+        The path is searched with A* and the Manhattan distance, so only the cells
+        around the straight line between both cells are usually visited.
+
+        Args:
+            start (int): The cell number to start from.
+            target (int): The cell number to reach.
+
+        Returns:
+            List[int]: The cell numbers of the path, without the start cell.
+
+        Raises:
+            RuntimeError: If the target cannot be reached.
+        """
+        top, bottom, left, right = self.region
+        target_y, target_x = divmod(target, self.size)
+        previous = {start: None}
+        costs = {start: 0}
+        queue = [(0, 0, start)]
+        while queue:
+            _, h, cell = heapq.heappop(queue)
+            if cell == target:
+                path = []
+                while cell != start:
+                    path.append(cell)
+                    cell = previous[cell]
+                path.reverse()
+                return path
+            g = costs[cell] + 1
+            y, x = divmod(cell, self.size)
+            for y2, x2 in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                neighbour = y2 * self.size + x2
+                if (top <= y2 <= bottom and left <= x2 <= right and not self.locked[neighbour]
+                        and g < costs.get(neighbour, g + 1)):
+                    costs[neighbour] = g
+                    previous[neighbour] = cell
+                    h = abs(target_y - y2) + abs(target_x - x2)
+                    heapq.heappush(queue, (g + h, h, neighbour))
+        raise RuntimeError("No path from cell %i to cell %i." % (start, target))
+
+    def _solve_region(self, top, left):
+        """
+        Generate the moves solving the last region with the search of the solver.
+
+        Every goal tile of the region is renamed after the tile of the same cell
+        in the snail goal of the region size, so the region becomes a standard
+        puzzle, with its cached goal and heuristic tables.
+
+        Args:
+            top (int): The first row of the region.
+            left (int): The first column of the region.
+
+        Yields:
+            str: The moves of the zero tile.
+        """
+        puzzle = self.solver.get_puzzle(FINAL_SIZE)
+        cells = [(top + y) * self.size + left + x for y in range(FINAL_SIZE) for x in range(FINAL_SIZE)]
+        names = {self.goal[cell]: int(name) for cell, name in zip(cells, puzzle.goal_array.ravel())}
+        matrix = np.array([names[self.board[cell]] for cell in cells], dtype=np.uint16)
+
+        start_state = State(matrix.reshape(FINAL_SIZE, FINAL_SIZE))
+        solution_state, _, time, space = self.solver.search(puzzle, start_state)
+        if solution_state is None:
+            raise UnsolvablePuzzleError("Can't be solved")
+        self.time += time
+        self.space = space
+        yield from get_moves(solution_state)
+
+
+_MOVE_NAMES = {offset: move for move, offset in MOVES.items()}
@@ -0,0 +1,139 @@
+import numpy as np
+from array import array
+from PackedState import PackedState
+from State import State
+
+# Heuristic values kept for every node, the incremental heuristics of a child start from its parent's
+HEURISTICS = ("h_misplaced", "h_manhattan", "h_linear", "h_pdb", "h_walking")
+NO_PARENT = -1
+
+
+class NodeStore:
+    def __init__(self, puzzle, start_state, heuristics=HEURISTICS):
+        """
+        Initialize the NodeStore object.
+
+        Every node of a search is a row across growable arrays: its board, its
+        cost, its heuristic values and pattern keys, the index of its parent and
+        the cell of its zero tile, from which the move leading to it follows.
+        The search refers to nodes by index, so the tree is held by a few flat
+        arrays instead of a graph of state objects, and the states built to
+        expand a node are released right after.
+
+        Packed boards are stored as 64-bit integers, larger boards as the raw
+        bytes of their matrix, one fixed-width record after the other, so the
+        board of a node is its key in the seen set.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            start_state (State | PackedState): The initial state, giving the board type and the number of key columns.
+            heuristics (Tuple[str], optional): The heuristic values to keep, the others are left at 0.
+        """
+        self.puzzle = puzzle
+        self.packed = isinstance(start_state, PackedState)
+        self.boards = array("Q") if self.packed else bytearray()
+        self.dtype = None if self.packed else start_state.matrix.dtype
+        self.width = None if self.packed else start_state.matrix.nbytes
+        self.g = array("i")
+        self.h_total = array("i")
+        self.heuristics = {name: array("i") for name in heuristics}
+        self.pdb_keys = [array("q") for _ in start_state.pdb_keys or ()]
+        self.walking_keys = [array("q") for _ in start_state.walking_keys or ()]
+        self.parents = array("i")
+        self.zeros = array("H")
+
+    def __len__(self):
+        return len(self.g)
+
+    def add(self, state, parent):
+        """
+        Append a node for a state.
+
+        Args:
+            state (State | PackedState): The state of the node.
+            parent (int): The index of the parent node, NO_PARENT for the start node.
+
+        Returns:
+            int: The index of the new node.
+        """
+        if self.packed:
+            self.boards.append(state.board)
+        else:
+            self.boards += state.key()
+        self.g.append(state.g)
+        self.h_total.append(state.h_total)
+        for name, column in self.heuristics.items():
+            column.append(getattr(state, name))
+        if self.pdb_keys:
+            for column, key in zip(self.pdb_keys, state.pdb_keys):
+                column.append(key)
+        if self.walking_keys:
+            for column, key in zip(self.walking_keys, state.walking_keys):
+                column.append(key)
+        self.parents.append(parent)
+        y, x = state.zero_tile
+        self.zeros.append(y * self.puzzle.size + x)
+        return len(self.parents) - 1
+
+    def key(self, index):
+        """
+        Get the key identifying the board of a node in the seen set.
+
+        Args:
+            index (int): The index of the node.
+
+        Returns:
+            int | bytes: The packed board, or the raw bytes of the matrix.
+        """
+        if self.packed:
+            return self.boards[index]
+        return bytes(self.boards[index * self.width:(index + 1) * self.width])
+
+    def state(self, index):
+        """
+        Build the state of a node, with its cost and heuristic values but no parent.
+
+        Args:
+            index (int): The index of the node.
+
+        Returns:
+            State | PackedState: The state of the node.
+        """
+        size = self.puzzle.size
+        zero_tile = self.puzzle.coordinates[self.zeros[index]]
+        if self.packed:
+            state = PackedState(self.boards[index], size, zero_tile)
+        else:
+            matrix = np.frombuffer(self.key(index), dtype=self.dtype).reshape(size, size)
+            state = State(matrix, zero_tile)
+        state.g = self.g[index]
+        state.h_total = self.h_total[index]
+        for name, column in self.heuristics.items():
+            setattr(state, name, column[index])
+        if self.pdb_keys:
+            state.pdb_keys = tuple(column[index] for column in self.pdb_keys)
+        if self.walking_keys:
+            state.walking_keys = tuple(column[index] for column in self.walking_keys)
+        return state
+
+    def solution(self, index):
+        """
+        Rebuild the chain of states from the start node to a node, walking the parent indexes.
+
+        Args:
+            index (int): The index of the last node.
+
+        Returns:
+            State | PackedState: The state of the node, linked to the start state through its parents.
+        """
+        indexes = []
+        while index != NO_PARENT:
+            indexes.append(index)
+            index = self.parents[index]
+
+        state = None
+        for index in reversed(indexes):
+            move = self.state(index)
+            move.parent = state
+            state = move
+        return state
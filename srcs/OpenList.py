@@ -0,0 +1,130 @@
+import heapq
+
+
+class OpenList:
+    def __init__(self, max_size=None):
+        """
+        Initialize the OpenList object.
+
+        States are kept in buckets by f-value, then by h-value, each bucket being a
+        stack. Popping takes the lowest f, then the lowest h, then the most recently
+        pushed state. Only the latest state pushed for a key is live: the older ones
+        are skipped when they come up.
+
+        Args:
+            max_size (int, optional): The maximum number of live states. When it is
+                exceeded, the worst state is evicted. Unbounded if not given.
+        """
+        self.max_size = max_size
+        self.buckets = {}
+        self.f_values = []
+        self.worst_f_values = []
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def get(self, key):
+        """
+        Get the live state pushed for a key.
+
+        Args:
+            key: The key identifying the board of the state.
+
+        Returns:
+            State | PackedState: The live state, or None if the key is not in the open list.
+        """
+        return self.entries.get(key)
+
+    def push(self, key, state, f, h):
+        """
+        Push a state, replacing the state previously pushed with the same key.
+
+        Args:
+            key: The key identifying the board of the state.
+            state (State | PackedState): The state.
+            f (int | float): The priority of the state, lowest first.
+            h (int | float): The tie-breaker of states with the same f, lowest first.
+
+        Returns:
+            List[State | PackedState]: The states evicted to stay under the maximum size.
+        """
+        bucket = self.buckets.get(f)
+        if bucket is None:
+            # Both heaps may still hold f from a drained bucket, those copies are skipped when popped
+            bucket = self.buckets[f] = ({}, [])
+            heapq.heappush(self.f_values, f)
+            heapq.heappush(self.worst_f_values, -f)
+        stacks, h_values = bucket
+        stack = stacks.get(h)
+        if stack is None:
+            stack = stacks[h] = []
+            heapq.heappush(h_values, h)
+        stack.append((key, state))
+        self.entries[key] = state
+
+        evicted = []
+        while self.max_size is not None and len(self.entries) > self.max_size:
+            evicted.append(self.pop_worst())
+        return evicted
+
+    def pop(self):
+        """
+        Pop the live state with the lowest f, then the lowest h, then the most recently pushed.
+
+        Returns:
+            State | PackedState: The state, or None if the open list is empty.
+        """
+        while self.f_values:
+            bucket = self.buckets.get(self.f_values[0])
+            if bucket is not None:
+                stacks, h_values = bucket
+                while h_values:
+                    stack = stacks[h_values[0]]
+                    while stack:
+                        key, state = stack.pop()
+                        if self.entries.get(key) is state:
+                            del self.entries[key]
+                            return state
+                    del stacks[heapq.heappop(h_values)]
+                del self.buckets[self.f_values[0]]
+            heapq.heappop(self.f_values)
+        return None
+
+    def pop_worst(self):
+        """
+        Pop the live state with the highest f, then the highest h.
+
+        Returns:
+            State | PackedState: The state, or None if the open list is empty.
+        """
+        while self.worst_f_values:
+            f = -self.worst_f_values[0]
+            bucket = self.buckets.get(f)
+            if bucket is not None:
+                stacks = bucket[0]
+                for h in sorted(stacks, reverse=True):
+                    stack = stacks[h]
+                    while stack:
+                        key, state = stack.pop()
+                        if self.entries.get(key) is state:
+                            del self.entries[key]
+                            return state
+                del self.buckets[f]
+            heapq.heappop(self.worst_f_values)
+        return None
+
+    def peek_f(self):
+        """
+        Get the lowest f-value in the open list, which may belong to a replaced or drained state.
+
+        Returns:
+            int | float: The lowest f-value, or None if the open list is empty.
+        """
+        return self.f_values[0] if self.f_values else None
@@ -0,0 +1,223 @@
+import numpy as np
+from functools import lru_cache
+
+BITS = 4
+MASK = (1 << BITS) - 1
+MAX_SIZE = 4
+
+
+class PackedState:
+    __slots__ = ("board", "size", "parent", "h_total", "h_misplaced", "h_manhattan", "h_linear", "h_pdb", "pdb_keys",
+                 "h_walking", "walking_keys", "g", "zero_tile")
+
+    def __init__(self, board, size, zero_tile):
+        """
+        Initialize the PackedState object.
+
+        The board is a single integer holding 4 bits per tile in row-major order,
+        which only fits boards up to 4x4.
+
+        Args:
+            board (int): The packed board.
+            size (int): The size of the puzzle grid.
+            zero_tile (Tuple[int, int]): The coordinates of the zero tile.
+        """
+        self.board = board
+        self.size = size
+        self.parent = None
+        self.h_total = 0
+        self.h_misplaced = 0
+        self.h_manhattan = 0
+        self.h_linear = 0
+        self.h_pdb = 0
+        self.pdb_keys = None
+        self.h_walking = 0
+        self.walking_keys = None
+        self.g = 0
+        self.zero_tile = zero_tile
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Create a packed copy of a State, keeping its heuristics and cost.
+
+        Args:
+            state (State): The state to pack.
+
+        Returns:
+            PackedState: The packed state.
+        """
+        size = len(state.matrix)
+        y, x = state.zero_tile
+        packed = cls(pack_matrix(state.matrix), size, _coordinates(size)[y * size + x])
+        packed.copy_heuristics(state)
+        packed.g = state.g
+        return packed
+
+    def copy_heuristics(self, other):
+        """
+        Copy the heuristic values of another state.
+
+        Args:
+            other (State | PackedState): The state to copy the heuristic values from.
+        """
+        self.h_total = other.h_total
+        self.h_misplaced = other.h_misplaced
+        self.h_manhattan = other.h_manhattan
+        self.h_linear = other.h_linear
+        self.h_pdb = other.h_pdb
+        self.pdb_keys = other.pdb_keys
+        self.h_walking = other.h_walking
+        self.walking_keys = other.walking_keys
+
+    @property
+    def matrix(self):
+        """
+        Unpack the board into a matrix, for printing and full heuristic computations.
+
+        Returns:
+            numpy.ndarray: The matrix representing the state.
+        """
+        return unpack_board(self.board, self.size)
+
+    def tile_at(self, y, x):
+        """
+        Get the tile at the given coordinates.
+
+        Args:
+            y (int): The y-coordinate of the cell.
+            x (int): The x-coordinate of the cell.
+
+        Returns:
+            int: The tile value.
+        """
+        return (self.board >> (BITS * (y * self.size + x))) & MASK
+
+    def key(self):
+        """
+        Get the key identifying the board in the seen set.
+
+        Returns:
+            int: The packed board.
+        """
+        return self.board
+
+    def is_goal(self, puzzle):
+        """
+        Check if the board is the goal board of the puzzle.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+
+        Returns:
+            bool: True if the board is the goal board, False otherwise.
+        """
+        return self.board == puzzle.goal_packed
+
+    def child(self, board, zero_tile):
+        """
+        Create a child state one move away from this state.
+
+        Args:
+            board (int): The packed board of the child.
+            zero_tile (Tuple[int, int]): The coordinates of the zero tile in the child.
+
+        Returns:
+            PackedState: The child state.
+        """
+        move = PackedState(board, self.size, zero_tile)
+        move.parent = self
+        move.g = self.g + 1
+        return move
+
+    def get_neighbours(self, puzzle):
+        """
+        Generate and return the neighbor boards, swapping tiles with bit operations.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+
+        Returns:
+            Tuple: A tuple containing the neighbor boards and zero tile coordinates.
+        """
+        y, x = self.zero_tile
+        zero_shift = BITS * (y * self.size + x)
+        back = self.parent.zero_tile if self.parent else None
+        board = self.board
+        neighbours = []
+
+        for shift, zero_loc in _neighbour_table(self.size)[y * self.size + x]:
+            if zero_loc == back:
+                continue
+            tile = (board >> shift) & MASK
+            # The zero cell holds no bits, so xor moves the tile over it and clears its old cell
+            neighbours.append((board ^ (tile << shift) ^ (tile << zero_shift), zero_loc))
+
+        return tuple(neighbours)
+
+
+def pack_matrix(matrix):
+    """
+    Pack a matrix into an integer with 4 bits per tile, in row-major order.
+
+    Args:
+        matrix (numpy.ndarray): The matrix to pack.
+
+    Returns:
+        int: The packed board.
+    """
+    board = 0
+    for cell, tile in enumerate(np.ravel(matrix)):
+        board |= int(tile) << (BITS * cell)
+    return board
+
+
+def unpack_board(board, size):
+    """
+    Unpack an integer board back into a matrix.
+
+    Args:
+        board (int): The packed board.
+        size (int): The size of the puzzle grid.
+
+    Returns:
+        numpy.ndarray: The unpacked matrix.
+    """
+    tiles = [(board >> (BITS * cell)) & MASK for cell in range(size * size)]
+    return np.array(tiles, dtype=np.uint16).reshape(size, size)
+
+
+@lru_cache(maxsize=None)
+def _coordinates(size):
+    """
+    Get the shared coordinate tuples of every cell, so states do not allocate their own.
+
+    Args:
+        size (int): The size of the puzzle grid.
+
+    Returns:
+        Tuple[Tuple[int, int]]: The coordinates of each cell, indexed by cell number.
+    """
+    return tuple(divmod(cell, size) for cell in range(size * size))
+
+
+@lru_cache(maxsize=None)
+def _neighbour_table(size):
+    """
+    Get the bit shift and coordinates of the neighbouring cells of every cell.
+
+    Args:
+        size (int): The size of the puzzle grid.
+
+    Returns:
+        Tuple: For each cell number, a tuple of (bit shift, coordinates) pairs.
+    """
+    coordinates = _coordinates(size)
+    table = []
+    for y, x in coordinates:
+        table.append(tuple(
+            (BITS * (y2 * size + x2), coordinates[y2 * size + x2])
+            for y2, x2 in [(y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)]
+            if 0 <= y2 < size and 0 <= x2 < size
+        ))
+    return tuple(table)
@@ -0,0 +1,274 @@
+import gc
+import queue
+import time as timer
+import multiprocessing
+from OpenList import OpenList
+from PackedState import PackedState
+
+# Number of states sent together to another worker, and expansions between two flushes of every batch
+BATCH_SIZE = 64
+FLUSH_INTERVAL = 256
+# Expansions between two checks of the queue of a worker, while it has open states
+POLL_INTERVAL = 16
+# Seconds an idle worker waits for states, and between two termination checks of the main process
+IDLE_WAIT = 0.01
+CHECK_INTERVAL = 0.005
+
+# Slots of each worker in the shared counters
+IDLE, SENT, RECEIVED, TIME, SPACE = range(5)
+_SLOTS = 5
+
+
+def parallel_search(solver, puzzle, start_state, workers):
+    """
+    Perform a hash-distributed A* (HDA*) search with worker processes.
+
+    Every packed board is owned by one worker, chosen by a hash of the board.
+    Each worker keeps the open list and the seen boards it owns, expands its
+    best open state with the heuristics of the solver, and sends the children
+    owned by other workers to their queue, in batches. The best goal found is
+    shared, and states whose f-value reaches its cost are not expanded. The
+    search is over once every worker is idle and every batch sent was received,
+    read in a single snapshot of the shared counters: every state cheaper than
+    the goal was then expanded, so the path is the shortest.
+
+    Args:
+        solver (Solver): The solver, whose arguments and heuristics the workers use.
+        puzzle (Puzzle): The puzzle object representing the game.
+        start_state (PackedState): The initial state of the puzzle.
+        workers (int): The number of worker processes.
+
+    Returns:
+        solution_state (PackedState): The solution state, or None if it can't be solved.
+        time (int): Time complexity.
+        space (int): Space complexity.
+
+    Raises:
+        RuntimeError: If a worker process stops before the end of the search.
+    """
+    context = multiprocessing.get_context()
+    lock = context.Lock()
+    counters = context.RawArray("q", workers * _SLOTS)
+    best = context.RawArray("d", [float("inf")])
+    goal = context.RawArray("Q", 3)
+    inboxes = [context.Queue() for _ in range(workers)]
+    replies = context.Queue()
+
+    processes = [context.Process(target=_work, args=(solver, puzzle, index, workers, inboxes, replies, lock,
+                                                     counters, best, goal), daemon=True)
+                 for index in range(workers)]
+    for process in processes:
+        process.start()
+    try:
+        owner = _owner(start_state.board, workers)
+        with lock:
+            counters[owner * _SLOTS + SENT] += 1
+        inboxes[owner].put(("states", [_message(start_state, None)]))
+
+        while True:
+            timer.sleep(CHECK_INTERVAL)
+            if not all(process.is_alive() for process in processes):
+                raise RuntimeError("A parallel search worker stopped unexpectedly.")
+            with lock:
+                snapshot = counters[:]
+            sent = sum(snapshot[index * _SLOTS + SENT] for index in range(workers))
+            received = sum(snapshot[index * _SLOTS + RECEIVED] for index in range(workers))
+            if sent == received and all(snapshot[index * _SLOTS + IDLE] for index in range(workers)):
+                break
+        for inbox in inboxes:
+            inbox.put(("done",))
+
+        solution_state = None
+        if best[0] != float("inf"):
+            solution_state = _rebuild_path(puzzle, goal[:], workers, inboxes, replies)
+        for inbox in inboxes:
+            inbox.put(("stop",))
+        for process in processes:
+            process.join()
+        time = sum(counters[index * _SLOTS + TIME] for index in range(workers))
+        space = sum(counters[index * _SLOTS + SPACE] for index in range(workers))
+        return solution_state, time, space
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+
+def _rebuild_path(puzzle, goal, workers, inboxes, replies):
+    """
+    Rebuild the chain of states of the solution, asking the owner of each board for its parent.
+
+    Args:
+        puzzle (Puzzle): The puzzle object representing the game.
+        goal (List[int]): The goal board, and the coordinates of its zero tile.
+        workers (int): The number of worker processes.
+        inboxes (List[multiprocessing.Queue]): The queue of each worker.
+        replies (multiprocessing.Queue): The queue the workers answer on.
+
+    Returns:
+        PackedState: The solution state, linked to the start state through its parents.
+    """
+    board, y, x = goal
+    zero_tile = (y, x)
+    chain = []
+    while board is not None:
+        chain.append((board, zero_tile))
+        inboxes[_owner(board, workers)].put(("parent", board))
+        board, zero_tile = replies.get()
+
+    state = None
+    for g, (board, zero_tile) in enumerate(reversed(chain)):
+        move = PackedState(board, puzzle.size, zero_tile)
+        move.parent = state
+        move.g = g
+        state = move
+    return state
+
+
+def _work(solver, puzzle, index, workers, inboxes, replies, lock, counters, best, goal):
+    """
+    Run a worker process of the parallel search, until the main process stops it.
+
+    Once the main process sends that the search is done, the worker answers the
+    parent requests rebuilding the path, until it is sent to stop.
+
+    Args:
+        solver (Solver): The solver, whose arguments and heuristics the worker uses.
+        puzzle (Puzzle): The puzzle object representing the game.
+        index (int): The index of the worker.
+        workers (int): The number of worker processes.
+        inboxes (List[multiprocessing.Queue]): The queue of each worker.
+        replies (multiprocessing.Queue): The queue to answer the parent requests on.
+        lock (multiprocessing.Lock): The lock of the shared counters and of the best goal.
+        counters (multiprocessing.RawArray): The idle flag and the counters of each worker.
+        best (multiprocessing.RawArray): The cost of the best goal found.
+        goal (multiprocessing.RawArray): The board of the best goal found, and the coordinates of its zero tile.
+    """
+    # States only link to their parents, the cyclic garbage collector would only rescan the seen boards
+    gc.disable()
+    inbox = inboxes[index]
+    slot = index * _SLOTS
+    openset = OpenList()
+    # Best cost, parent board and zero tile of the parent of every board owned by this worker
+    seenset = {}
+    outboxes = [[] for _ in range(workers)]
+    time = 0
+
+    def receive(messages):
+        for board, zero_tile, g, heuristics, parent_board, parent_zero_tile in messages:
+            seen = seenset.get(board)
+            if seen is not None and seen[0] <= g:
+                continue
+            seenset[board] = (g, parent_board, parent_zero_tile)
+            state = PackedState(board, puzzle.size, zero_tile)
+            state.g = g
+            (state.h_total, state.h_misplaced, state.h_manhattan, state.h_linear, state.h_pdb,
+             state.pdb_keys, state.h_walking, state.walking_keys) = heuristics
+            if parent_board is not None:
+                state.parent = PackedState(parent_board, puzzle.size, parent_zero_tile)
+            openset.push(board, state, g + state.h_total, state.h_total)
+
+    def flush(outbox_index):
+        with lock:
+            counters[outbox_index * _SLOTS + SENT] += 1
+        inboxes[outbox_index].put(("states", outboxes[outbox_index]))
+        outboxes[outbox_index] = []
+
+    polled = 0
+    while True:
+        if not openset or time - polled >= POLL_INTERVAL:
+            polled = time
+            message = None
+            try:
+                message = inbox.get_nowait() if openset else inbox.get(timeout=IDLE_WAIT)
+                while message[0] == "states":
+                    with lock:
+                        counters[slot + RECEIVED] += 1
+                        counters[slot + IDLE] = 0
+                    receive(message[1])
+                    message = inbox.get_nowait()
+            except queue.Empty:
+                pass
+            if message is not None and message[0] == "done":
+                break
+
+        current_state = openset.pop()
+        if current_state is None or current_state.g + current_state.h_total >= best[0]:
+            if current_state is None:
+                for outbox_index in range(workers):
+                    if outboxes[outbox_index]:
+                        flush(outbox_index)
+                with lock:
+                    counters[slot + IDLE] = 1
+                    counters[slot + SPACE] = len(seenset)
+            continue
+        time += 1
+
+        if solver.is_goal(current_state, puzzle):
+            with lock:
+                if current_state.g < best[0]:
+                    best[0] = current_state.g
+                    goal[0] = current_state.board
+                    goal[1], goal[2] = current_state.zero_tile
+            continue
+
+        for board, zero_loc in current_state.get_neighbours(puzzle):
+            move = current_state.child(board, zero_loc)
+            solver.get_optimized_heuristics(move, puzzle)
+            owner = _owner(board, workers)
+            if owner == index:
+                seen = seenset.get(board)
+                if seen is None or move.g < seen[0]:
+                    seenset[board] = (move.g, current_state.board, current_state.zero_tile)
+                    openset.push(board, move, move.g + move.h_total, move.h_total)
+            else:
+                outboxes[owner].append(_message(move, current_state))
+                if len(outboxes[owner]) >= BATCH_SIZE:
+                    flush(owner)
+        if time % FLUSH_INTERVAL == 0:
+            for outbox_index in range(workers):
+                if outboxes[outbox_index]:
+                    flush(outbox_index)
+
+    with lock:
+        counters[slot + TIME] = time
+        counters[slot + SPACE] = len(seenset)
+    while True:
+        message = inbox.get()
+        if message[0] == "parent":
+            _, parent_board, parent_zero_tile = seenset[message[1]]
+            replies.put((parent_board, parent_zero_tile))
+        elif message[0] == "stop":
+            return
+
+
+def _message(state, parent):
+    """
+    Pack a state and its parent board into a message for the worker owning the state.
+
+    Args:
+        state (PackedState): The state.
+        parent (PackedState): The parent of the state, None for the start state.
+
+    Returns:
+        Tuple: The board, zero tile, cost and heuristics of the state, and the board and zero tile of its parent.
+    """
+    heuristics = (state.h_total, state.h_misplaced, state.h_manhattan, state.h_linear, state.h_pdb, state.pdb_keys,
+                  state.h_walking, state.walking_keys)
+    if parent is None:
+        return state.board, state.zero_tile, state.g, heuristics, None, None
+    return state.board, state.zero_tile, state.g, heuristics, parent.board, parent.zero_tile
+
+
+def _owner(board, workers):
+    """
+    Get the worker owning a packed board, from a multiplicative hash of the board.
+
+    Args:
+        board (int): The packed board.
+        workers (int): The number of worker processes.
+
+    Returns:
+        int: The index of the owning worker.
+    """
+    return (((board * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32) % workers
@@ -1,6 +1,16 @@
+import os
 import sys
+import mmap
 import argparse
 import numpy as np
+from Errors import MalformedPuzzleError
+
+ALGORITHMS = ("astar", "ida", "bidirectional", "anytime", "parallel")
+FORMATS = ("moves", "json", "boards")
+SYNTAX_ERROR = "Input file is not correctly formatted."
+SIZE_ERROR = "Puzzle size must be between 3 and 100."
+# Bytes of the digits and blanks of the rows, the only ones allowed outside comments
+_NUMBER_BYTES = b"0123456789 \t\r\n\v\f"
 
 
 class Parser:
@@ -30,6 +40,14 @@ class Parser:
             help="find a path as fast as possible, not guaranteed to be the shortest solution",
             action="store_true",
         )
+        self.parser.add_argument(
+            "--weight",
+            help="weight w of the heuristic, searching by g + w * h: the path found is at most\n"
+                 "w times longer than the shortest one (default: 1, the shortest path).\n"
+                 "Starting weight of the anytime algorithm (default: 3)",
+            type=float,
+            default=1.0,
+        )
         self.parser.add_argument(
             "--uniform",
             "-u",
@@ -54,6 +72,143 @@ class Parser:
             help="use the Manhattan distance heuristic",
             action="store_true",
         )
+        self.parser.add_argument(
+            "--linear",
+            "-l",
+            help="use the linear conflict heuristic",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--pdb",
+            "-p",
+            help="use the additive pattern database heuristic, up to 5x5 (tables are built once and cached),\n"
+                 "combined with the other selected heuristics by taking the largest value",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--walking",
+            "-W",
+            help="use the walking distance heuristic, up to 4x4 (tables are built once and cached),\n"
+                 "combined with the other selected heuristics by taking the largest value",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--algorithm",
+            "-a",
+            help="search algorithm to use:\n"
+                 "  astar: A* search, keeps every seen state in memory (default)\n"
+                 "  ida: iterative-deepening A*, memory bounded by the search depth\n"
+                 "  bidirectional: A* from both the start and the goal, meeting in the middle\n"
+                 "  anytime: ARA*, weighted A* paths shortened with a decreasing weight until\n"
+                 "           the shortest one is proven or the deadline runs out\n"
+                 "  parallel: A* spread over worker processes by a hash of the board, up to 4x4",
+            choices=ALGORITHMS,
+            default="astar",
+        )
+        self.parser.add_argument(
+            "--deadline",
+            help="time budget in seconds of the anytime algorithm, the best path found by then is returned",
+            type=float,
+        )
+        self.parser.add_argument(
+            "--large",
+            "-L",
+            help="solve the board side by side with scripted moves down to a 3x3 region, then with\n"
+                 "the selected search: polynomial time for boards up to 100x100, not the shortest path",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--format",
+            "-f",
+            help="output format of the solution:\n"
+                 "  moves: the moves of the empty cell as a single U/D/L/R string, then the totals (default)\n"
+                 "  json: one JSON object with the path, the totals and the timings\n"
+                 "  boards: every board from the start to the goal, then the totals",
+            choices=FORMATS,
+            default="moves",
+        )
+        self.parser.add_argument(
+            "--cache",
+            "-c",
+            help="reuse the solutions of boards solved before with the same options, and of their\n"
+                 "symmetric boards, from a memory cache and an on-disk cache",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--stats",
+            "--profile",
+            help="count and time the steps of the A* search, and write them as a JSON report",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--stats-file",
+            help="file to write the JSON report of the stats mode to (default: standard error)",
+        )
+        self.parser.add_argument(
+            "--max-open",
+            help="maximum number of states in the A* open list, the worst ones are pruned beyond it",
+            type=int,
+        )
+        self.parser.add_argument(
+            "--max-nodes",
+            help="node budget: stop the search with a 'budget exceeded' result once it expanded\n"
+                 "more states than this",
+            type=int,
+        )
+        self.parser.add_argument(
+            "--max-time",
+            help="time budget: stop the search with a 'budget exceeded' result once it ran\n"
+                 "for more seconds than this",
+            type=float,
+        )
+        self.parser.add_argument(
+            "--batch",
+            "-b",
+            help="solve every puzzle of a directory, a glob pattern or a multi-puzzle file,\n"
+                 "writing one JSON line of results per puzzle",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--serve",
+            help="serve the solver over HTTP/JSON: POST {\"board\": [[...]], \"timeout\": seconds} to /solve",
+            action="store_true",
+        )
+        self.parser.add_argument(
+            "--host",
+            help="address the server mode listens on (default: 127.0.0.1)",
+            default="127.0.0.1",
+        )
+        self.parser.add_argument(
+            "--port",
+            help="port the server mode listens on (default: 8080)",
+            type=int,
+            default=8080,
+        )
+        self.parser.add_argument(
+            "--max-pending",
+            help="requests the server mode accepts at once, solving or waiting for a worker,\n"
+                 "the next ones are answered 503 (default: 4 per worker)",
+            type=int,
+        )
+        self.parser.add_argument(
+            "--workers",
+            "-w",
+            help="number of worker processes in batch mode, server mode and parallel search\n"
+                 "(default: number of CPUs)",
+            type=int,
+            default=os.cpu_count(),
+        )
+        self.parser.add_argument(
+            "--timeout",
+            help="time limit in seconds for each puzzle in batch mode, and default deadline of\n"
+                 "each request in server mode",
+            type=float,
+        )
+        self.parser.add_argument(
+            "--output",
+            "-o",
+            help="file to write the batch mode results to (default: standard output)",
+        )
 
     def parse_arguments(self):
         """
@@ -64,9 +219,25 @@ class Parser:
         """
         args = self.parser.parse_args()
 
-        # If no heuristic argument is provided, use Manhattan
-        if True not in (args.misplaced, args.manhattan):
+        if args.batch and args.serve:
+            self.parser.error("batch mode and server mode cannot be used together")
+        if args.max_pending is not None and args.max_pending < 1:
+            self.parser.error("the server mode needs at least 1 pending request")
+        if args.batch and not args.filepath:
+            self.parser.error("batch mode needs a directory, a glob pattern or a file")
+        if args.max_open is not None and args.max_open < 1:
+            self.parser.error("the open list needs room for at least 1 state")
+        if args.max_nodes is not None and args.max_nodes < 1:
+            self.parser.error("the node budget must be at least 1")
+        if args.max_time is not None and args.max_time <= 0:
+            self.parser.error("the time budget must be positive")
+        if args.weight < 1:
+            self.parser.error("the heuristic weight must be at least 1")
+
+        # If no heuristic argument is provided, use Manhattan with linear conflict
+        if True not in (args.misplaced, args.manhattan, args.linear, args.pdb, args.walking):
             args.manhattan = True
+            args.linear = True
 
         return args
 
@@ -81,45 +252,159 @@ def parse_input_file(filepath):
     Returns:
         puzzle_size (int): Size of the puzzle.
         start_state (numpy.ndarray): Initial state of the puzzle.
+
+    Raises:
+        MalformedPuzzleError: If the file cannot be read or does not hold exactly one well-formed puzzle.
+    """
+    puzzles = parse_puzzles(filepath)
+    puzzle_size, start_state, error = next(puzzles, (None, None, MalformedPuzzleError(SYNTAX_ERROR)))
+    if error is not None:
+        raise error
+    if next(puzzles, None) is not None:
+        raise MalformedPuzzleError(SYNTAX_ERROR)
+    return puzzle_size, start_state
+
+
+def validate_board(board, puzzle_size=None):
+    """
+    Check that a board is a square grid holding every tile exactly once.
+
+    Args:
+        board (List[List[int]] | numpy.ndarray): The board to check.
+        puzzle_size (int, optional): The expected size of the board.
+
+    Returns:
+        numpy.ndarray: The board as a matrix.
+
+    Raises:
+        MalformedPuzzleError: If the board is not a well-formed n x n puzzle.
     """
     try:
-        with open(filepath, "r") as input_file:
-            start_state = []
-            puzzle_size = None
-            lines = input_file.readlines()
-            for line in lines:
-                # Ignore everything after a '#'
-                line = line.split("#")[0]
-
-                values = []
-                tokens = line.split()
-                for token in tokens:
-                    if token.isdigit():
-                        num = int(token)
-                        if puzzle_size is None:
-                            puzzle_size = num
-                            if not 0 <= puzzle_size <= 100:
-                                _handle_error(ValueError)
-                        else:
-                            values.append(num)
-                    else:
-                        _handle_error(SyntaxError)
-                if values:
-                    start_state.append(values)
-    except Exception as e:
-        _handle_error(e)
-
-    start_state = np.array(start_state, dtype=np.uint16)
+        start_state = np.asarray(board, dtype=np.int64)
+    except (TypeError, ValueError):
+        raise MalformedPuzzleError(SYNTAX_ERROR)
+    if puzzle_size is None:
+        puzzle_size = len(start_state)
 
     # Check if the matrix is the right shape
     if np.shape(start_state) != (puzzle_size, puzzle_size):
-        _handle_error(SyntaxError)
+        raise MalformedPuzzleError(SYNTAX_ERROR)
 
-    # Check if the tile numbers are correct
-    if not np.in1d(list(range(puzzle_size ** 2)), start_state).all():
-        _handle_error(SyntaxError)
+    # Check if the tile numbers are correct, counting each tile in linear time
+    tiles = start_state.ravel()
+    if tiles.size and (tiles.min() < 0 or tiles.max() >= tiles.size):
+        raise MalformedPuzzleError(SYNTAX_ERROR)
+    if not np.all(np.bincount(tiles, minlength=tiles.size) == 1):
+        raise MalformedPuzzleError(SYNTAX_ERROR)
 
-    return puzzle_size, start_state
+    return start_state.astype(np.uint16)
+
+
+def parse_puzzles(filepath):
+    """
+    Lazily parse a file holding one or more puzzles, each starting with its own size line.
+
+    The file is memory-mapped and read line by line, and the rows of each
+    puzzle are converted to integers at once. A malformed puzzle is yielded
+    with its error, and parsing goes on from the next size line.
+
+    Args:
+        filepath (str): Path to the input file.
+
+    Yields:
+        puzzle_size (int): Size of the puzzle, None if its size line is malformed.
+        start_state (numpy.ndarray): Initial state of the puzzle, None if it is malformed.
+        error (MalformedPuzzleError): The error of a malformed puzzle, None if it is well-formed.
+
+    Raises:
+        MalformedPuzzleError: If the file cannot be read.
+    """
+    try:
+        with open(filepath, "rb") as input_file:
+            yield from _parse_lines(_read_lines(input_file))
+    except OSError as e:
+        raise MalformedPuzzleError(str(e))
+
+
+def _read_lines(input_file):
+    """
+    Read the lines of a binary file, through a memory map when the file can be mapped.
+
+    Args:
+        input_file (io.BufferedReader): The opened file.
+
+    Yields:
+        bytes: Each line of the file.
+    """
+    try:
+        data = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        # Empty files, pipes and special files cannot be mapped
+        yield from input_file
+        return
+    with data:
+        yield from iter(data.readline, b"")
+
+
+def _parse_lines(lines):
+    """
+    Parse the puzzles of a stream of lines.
+
+    A line that is not a size line where one is expected is skipped, up to the
+    next line holding a single number.
+
+    Args:
+        lines (Iterable[bytes]): The lines of the input.
+
+    Yields:
+        puzzle_size (int): Size of the puzzle, None if its size line is malformed.
+        start_state (numpy.ndarray): Initial state of the puzzle, None if it is malformed.
+        error (MalformedPuzzleError): The error of a malformed puzzle, None if it is well-formed.
+    """
+    puzzle_size = None
+    rows = []
+    error = None
+    skipping = False
+    for line in lines:
+        # Ignore everything after a '#'
+        line = line.split(b"#", 1)[0]
+        width = len(line.split())
+        if not width:
+            continue
+        malformed = bool(line.translate(None, _NUMBER_BYTES))
+
+        if puzzle_size is None:
+            if width != 1 or malformed:
+                if not skipping:
+                    skipping = True
+                    yield None, None, MalformedPuzzleError(SYNTAX_ERROR)
+                continue
+            skipping = False
+            puzzle_size = int(line)
+            if not 0 < puzzle_size <= 100:
+                puzzle_size = None
+                skipping = True
+                yield None, None, MalformedPuzzleError(SIZE_ERROR)
+            continue
+
+        rows.append(line)
+        if malformed or width != puzzle_size:
+            error = MalformedPuzzleError(SYNTAX_ERROR)
+        if len(rows) == puzzle_size:
+            start_state = None
+            if error is None:
+                tiles = np.fromstring(b" ".join(rows), dtype=np.int64, sep=" ")
+                try:
+                    start_state = validate_board(tiles.reshape(puzzle_size, puzzle_size), puzzle_size)
+                except MalformedPuzzleError as e:
+                    error = e
+            yield puzzle_size, start_state, error
+            puzzle_size = None
+            rows = []
+            error = None
+
+    if puzzle_size is not None:
+        yield puzzle_size, None, MalformedPuzzleError(SYNTAX_ERROR)
 
 
 def _handle_error(error):
@@ -130,9 +415,9 @@ def _handle_error(error):
         error: The error type.
     """
     if error == SyntaxError:
-        print("Input file is not correctly formatted.")
+        print(SYNTAX_ERROR)
     elif error == ValueError:
-        print("Puzzle size must be between 3 and 100.")
+        print(SIZE_ERROR)
     else:
         print(error)
     sys.exit()
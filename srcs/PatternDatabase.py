@@ -0,0 +1,158 @@
+import numpy as np
+from TableCache import load_table, save_table
+
+MAX_SIZE = 5
+MAX_TABLE_SIZE = 2 ** 24
+UNSEEN = 255
+
+
+class PatternDatabase:
+    def __init__(self, puzzle):
+        """
+        Initialize the PatternDatabase object, loading its tables from the cache or building them.
+
+        The tiles are split into disjoint groups of consecutive goal tiles (6-6-3
+        on a 4x4 board). Each table only counts the moves of the tiles of its
+        group, so the values of all groups can be added together.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+        """
+        self.size = puzzle.size
+        self.cells = puzzle.size ** 2
+        self.groups = _split_groups(self.cells)
+        self.group_of = [None] * self.cells
+        self.weight_of = [0] * self.cells
+        for g, group in enumerate(self.groups):
+            for j, tile in enumerate(group):
+                self.group_of[tile] = g
+                self.weight_of[tile] = self.cells ** j
+        self.tables = [self._load_or_build(puzzle, group) for group in self.groups]
+
+    def keys(self, matrix):
+        """
+        Compute the index of the board in every pattern table.
+
+        Args:
+            matrix (numpy.ndarray): The current state matrix.
+
+        Returns:
+            Tuple[int]: The index in each pattern table.
+        """
+        keys = [0] * len(self.groups)
+        for cell, tile in enumerate(np.ravel(matrix)):
+            if tile:
+                keys[self.group_of[tile]] += cell * self.weight_of[tile]
+        return tuple(keys)
+
+    def lookup(self, keys):
+        """
+        Get the additive heuristic value for the given pattern indexes.
+
+        Args:
+            keys (Tuple[int]): The index in each pattern table.
+
+        Returns:
+            int: The sum of the pattern table values.
+        """
+        return sum(int(table[key]) for table, key in zip(self.tables, keys))
+
+    def update(self, h, keys, tile, src, dst):
+        """
+        Update the heuristic value after a tile move, only looking up the pattern containing the tile.
+
+        Args:
+            h (int): The heuristic value before the move.
+            keys (Tuple[int]): The index in each pattern table before the move.
+            tile (int): The moved tile.
+            src (int): The cell number the tile left.
+            dst (int): The cell number the tile entered.
+
+        Returns:
+            h (int): The heuristic value after the move.
+            keys (Tuple[int]): The index in each pattern table after the move.
+        """
+        g = self.group_of[tile]
+        table = self.tables[g]
+        key = keys[g] + (dst - src) * self.weight_of[tile]
+        h += int(table[key]) - int(table[keys[g]])
+        return h, keys[:g] + (key,) + keys[g + 1:]
+
+    def _load_or_build(self, puzzle, group):
+        """
+        Load a pattern table from the cache, or build and cache it.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            group (Tuple[int]): The tiles of the pattern.
+
+        Returns:
+            numpy.ndarray: The pattern table.
+        """
+        filename = "pdb_%i_%s.npy" % (self.size, "-".join(map(str, group)))
+        table = load_table(filename)
+        if table is None:
+            table = self._build_table(puzzle, group)
+            save_table(filename, table)
+        return table
+
+    def _build_table(self, puzzle, group):
+        """
+        Build a pattern table by breadth-first search backwards from the goal.
+
+        Every board of the pattern tiles is indexed by the sum of cell * cells^j
+        over its tiles. The other tiles and the zero tile are ignored, so a pattern
+        tile can move to any neighbouring cell not taken by another pattern tile.
+        A whole BFS layer is expanded at once with NumPy.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            group (Tuple[int]): The tiles of the pattern.
+
+        Returns:
+            numpy.ndarray: The number of pattern tile moves to the goal, for every index.
+        """
+        size, cells = self.size, self.cells
+        neighbours = np.full((cells, 4), -1, dtype=np.int64)
+        for cell in range(cells):
+            y, x = divmod(cell, size)
+            for d, (y2, x2) in enumerate([(y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)]):
+                if 0 <= y2 < size and 0 <= x2 < size:
+                    neighbours[cell, d] = y2 * size + x2
+
+        weights = cells ** np.arange(len(group), dtype=np.int64)
+        table = np.full(cells ** len(group), UNSEEN, dtype=np.uint8)
+        start = sum(int(weights[j]) * (y * size + x) for j, (y, x) in enumerate(puzzle.goal[t] for t in group))
+        table[start] = 0
+        frontier = np.array([start], dtype=np.int64)
+        depth = 0
+
+        while frontier.size:
+            depth += 1
+            positions = (frontier[:, None] // weights) % cells
+            for j in range(len(group)):
+                for d in range(4):
+                    dst = neighbours[positions[:, j], d]
+                    free = (dst >= 0) & ~(positions == dst[:, None]).any(axis=1)
+                    moved = frontier[free] + (dst[free] - positions[free, j]) * weights[j]
+                    table[moved[table[moved] == UNSEEN]] = depth
+            frontier = np.flatnonzero(table == depth)
+
+        return table
+
+
+def _split_groups(cells):
+    """
+    Split the tiles into consecutive groups, as large as the table size allows.
+
+    Args:
+        cells (int): The number of cells of the puzzle.
+
+    Returns:
+        List[Tuple[int]]: The tiles of each group.
+    """
+    group_size = 1
+    while cells ** (group_size + 1) <= MAX_TABLE_SIZE:
+        group_size += 1
+    tiles = list(range(1, cells))
+    return [tuple(tiles[i:i + group_size]) for i in range(0, len(tiles), group_size)]
@@ -1,6 +1,12 @@
+import copy
 import numpy as np
+from functools import lru_cache
 from random import choice
 from State import State
+from PackedState import MAX_SIZE, pack_matrix
+
+# Largest size whose Manhattan delta table is built, it holds size^6 entries
+DELTA_MAX_SIZE = 10
 
 
 class Puzzle:
@@ -15,6 +21,18 @@ class Puzzle:
         self.goal_array = np.array(self._generate_goal_array(self.size, self.size, 1), dtype=np.uint16)
         self.goal = [None] * (self.size ** 2)
         self.get_goal()
+        self.goal_packed = pack_matrix(self.goal_array) if self.size <= MAX_SIZE else None
+        # Index of each tile in the goal array read row by row, and goal row and column of each tile
+        self.goal_rank = np.argsort(self.goal_array, axis=None)
+        self.goal_coordinates = np.array(self.goal)
+        # Coordinates and neighbouring cell numbers of every cell number
+        self.coordinates = tuple(divmod(cell, size) for cell in range(size * size))
+        self.neighbours = tuple(
+            tuple(y2 * size + x2 for y2, x2 in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1))
+                  if 0 <= y2 < size and 0 <= x2 < size)
+            for y, x in self.coordinates
+        )
+        self.manhattan_delta = self._generate_manhattan_delta()
 
     def _generate_goal_array(self, rows, cols, start_value):
         """
@@ -37,6 +55,22 @@ class Puzzle:
             else [[0]]
         )
 
+    def _generate_manhattan_delta(self):
+        """
+        Generate the change of Manhattan distance of every tile moving from any cell to any other cell.
+
+        Returns:
+            List[int]: The change of distance to the goal of tile t moving from cell a to cell b,
+                at index (t * cells + a) * cells + b, or None if the size is above DELTA_MAX_SIZE.
+        """
+        if self.size > DELTA_MAX_SIZE:
+            return None
+        rows, columns = np.divmod(np.arange(self.size ** 2), self.size)
+        goal_rows, goal_columns = np.divmod(np.argsort(self.goal_array, axis=None), self.size)
+        distance = np.abs(rows - goal_rows[:, None]) + np.abs(columns - goal_columns[:, None])
+        distance[0] = 0
+        return (distance[:, None, :] - distance[:, :, None]).ravel().tolist()
+
     def get_goal(self):
         """
         Generate the goal positions for each tile value in the puzzle.
@@ -45,9 +79,63 @@ class Puzzle:
             for x, value in enumerate(row):
                 self.goal[value] = (y, x)
 
+    def with_goal(self, matrix):
+        """
+        Create a puzzle of the same size whose goal is the given matrix, to search backwards from the goal.
+
+        Args:
+            matrix (numpy.ndarray): The goal matrix of the new puzzle.
+
+        Returns:
+            Puzzle: The puzzle with the new goal.
+        """
+        puzzle = copy.copy(self)
+        puzzle.goal_array = np.array(matrix, dtype=np.uint16)
+        puzzle.goal = [None] * (self.size ** 2)
+        puzzle.get_goal()
+        puzzle.goal_packed = pack_matrix(puzzle.goal_array) if self.size <= MAX_SIZE else None
+        puzzle.goal_rank = np.argsort(puzzle.goal_array, axis=None)
+        puzzle.goal_coordinates = np.array(puzzle.goal)
+        puzzle.manhattan_delta = puzzle._generate_manhattan_delta()
+        return puzzle
+
+    def is_solvable(self, matrix):
+        """
+        Check if a board of this puzzle can reach the goal.
+
+        Each tile is replaced by its index in the goal, so the board becomes a
+        permutation whose inversion parity is the parity of its length minus its
+        number of cycles. This is O(N^2), and agrees with counting every pair of
+        tiles out of goal order. The board is solvable when that parity, offset by
+        the size, differs from the parity of the zero tile distance to the center.
+
+        Args:
+            matrix (numpy.ndarray): The board to check.
+
+        Returns:
+            bool: True if the board can be solved, False otherwise.
+        """
+        ranks = self.goal_rank[np.ravel(matrix)]
+        seen = np.zeros(len(ranks), dtype=bool)
+        cycles = 0
+        for start in range(len(ranks)):
+            if not seen[start]:
+                cycles += 1
+                index = start
+                while not seen[index]:
+                    seen[index] = True
+                    index = ranks[index]
+        inversions = len(ranks) - cycles
+
+        zero_row, zero_column = divmod(int(np.flatnonzero(np.ravel(matrix) == 0)[0]), self.size)
+        center = self.size // 2
+        return (inversions + self.size) % 2 != (abs(center - zero_column) + abs(center - zero_row)) % 2
+
     def shuffle(self, state, amount):
         """
-        Shuffle the puzzle by performing random moves.
+        Shuffle the puzzle by performing random moves, none undoing the previous one.
+
+        The moves are made in place on a single copy of the board.
 
         Args:
             state (State): The current state of the puzzle.
@@ -56,9 +144,55 @@ class Puzzle:
         Returns:
             State: The shuffled state.
         """
+        board = state.matrix.ravel().copy()
+        zero = state.zero_tile[0] * self.size + state.zero_tile[1]
+        previous = None
         for _ in range(amount):
-            neighbours, zero_loc = choice(state.get_neighbours(self))
-            neighbour = State(neighbours)
-            neighbour.zero_tile = zero_loc
-            state = neighbour
-        return state
+            cell = choice([cell for cell in self.neighbours[zero] if cell != previous])
+            board[zero], board[cell] = board[cell], 0
+            previous, zero = zero, cell
+        return State(board.reshape(self.size, self.size), self.coordinates[zero])
+
+
+def check_solvable(puzzle, matrix):
+    """
+    Validation stage rejecting the boards that cannot reach the goal of the puzzle.
+
+    Args:
+        puzzle (Puzzle): The puzzle object representing the game.
+        matrix (numpy.ndarray): The start board.
+
+    Returns:
+        str: The reason the board is rejected, or None if it can be solved.
+    """
+    if not puzzle.is_solvable(matrix):
+        return "The permutation parity of the board differs from the goal, no sequence of moves can reach it."
+    return None
+
+
+def is_solvable(board):
+    """
+    Check if a board can reach the snail goal of its size, without creating a Puzzle for every call.
+
+    Args:
+        board (List[List[int]] | numpy.ndarray): The board to check.
+
+    Returns:
+        bool: True if the board can be solved, False otherwise.
+    """
+    matrix = np.asarray(board)
+    return _puzzle_for_size(len(matrix)).is_solvable(matrix)
+
+
+@lru_cache(maxsize=None)
+def _puzzle_for_size(size):
+    """
+    Get a shared Puzzle of the given size.
+
+    Args:
+        size (int): The size of the puzzle grid.
+
+    Returns:
+        Puzzle: The puzzle of that size.
+    """
+    return Puzzle(size)
@@ -0,0 +1,328 @@
+import json
+import signal
+import asyncio
+import time as timer
+from concurrent.futures import ProcessPoolExecutor
+from Batch import PuzzleTimeout, _raise_timeout
+from Errors import MalformedPuzzleError, UnsolvablePuzzleError, BudgetExceededError
+from Parser import validate_board
+from Solver import Solver
+
+# Sizes whose goal and heuristic tables each worker builds before the first request
+WARM_SIZES = (3, 4)
+# Largest request body read, in bytes, a 100x100 board takes about 50 KB
+MAX_BODY = 1 << 20
+# Seconds an idle keep-alive connection is kept open, and extra seconds waited for a worker past a deadline
+IDLE_TIMEOUT = 30.0
+DEADLINE_GRACE = 1.0
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+# HTTP status of each result status of a solve
+STATUSES = {"solved": 200, "unsolvable": 422, "error": 400, "busy": 503, "timeout": 504, "budget_exceeded": 504}
+
+# Each worker process keeps its own solver, so goal and heuristic tables stay loaded between requests
+_solver = None
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def run_server(args):
+    """
+    Serve the solver over HTTP/JSON until interrupted.
+
+    POST /solve takes {"board": [[...], ...], "timeout": seconds} and answers
+    with the status of the solve, its moves and its search counters. GET /health
+    answers with the number of workers and of requests in flight.
+
+    Args:
+        args: Command-line arguments.
+    """
+    try:
+        asyncio.run(Server(args).serve())
+    except KeyboardInterrupt:
+        pass
+
+
+class Server:
+    def __init__(self, args):
+        """
+        Initialize the Server object.
+
+        At most one solve per worker runs at a time. Requests beyond that wait
+        for a worker, up to the pending limit, above which they are turned away
+        at once so that clients back off instead of piling up.
+
+        Args:
+            args: Command-line arguments.
+        """
+        self.args = args
+        self.workers = max(args.workers or 1, 1)
+        self.max_pending = args.max_pending if args.max_pending is not None else 4 * self.workers
+        self.executor = None
+        self.slots = None
+        self.pending = 0
+        self.running = 0
+
+    async def serve(self):
+        """
+        Start the warm worker processes, then accept connections until cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        self.slots = asyncio.Semaphore(self.workers)
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                            initargs=(self.args,))
+        try:
+            # Start every worker now, so their tables are built before the first request
+            await asyncio.gather(*(loop.run_in_executor(self.executor, _ready) for _ in range(self.workers)))
+            server = await asyncio.start_server(self.handle, self.args.host, self.args.port)
+            async with server:
+                print("Serving on http://%s:%i with %i workers" % (self.args.host, self.args.port, self.workers),
+                      flush=True)
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        """
+        Answer the requests of a connection, keeping it open between requests unless asked to close it.
+
+        Args:
+            reader (asyncio.StreamReader): The stream of the connection.
+            writer (asyncio.StreamWriter): The writer of the connection.
+        """
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), IDLE_TIMEOUT)
+                except HttpError as e:
+                    await _write_response(writer, e.status, {"status": "error", "error": str(e)}, False)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload = await self.route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await _write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        """
+        Answer a request.
+
+        Args:
+            method (str): The HTTP method.
+            path (str): The path of the request.
+            body (bytes): The body of the request.
+
+        Returns:
+            status (int): The HTTP status.
+            payload (dict): The JSON answer.
+        """
+        path = path.split("?", 1)[0]
+        if path == "/health":
+            if method != "GET":
+                return 405, {"status": "error", "error": "Use GET on /health."}
+            return 200, {"status": "ok", "workers": self.workers, "running": self.running, "pending": self.pending}
+        if path != "/solve":
+            return 404, {"status": "error", "error": "Unknown path %s." % path}
+        if method != "POST":
+            return 405, {"status": "error", "error": "Use POST on /solve."}
+
+        try:
+            request = json.loads(body)
+            board = validate_board(request["board"])
+            timeout = request.get("timeout", self.args.timeout)
+            if timeout is not None and not (isinstance(timeout, (int, float)) and timeout > 0):
+                raise ValueError("The timeout must be a positive number of seconds.")
+        except MalformedPuzzleError as e:
+            return 400, {"status": "error", "error": str(e)}
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return 400, {"status": "error", "error": 'The body must be a JSON object with a "board" and an '
+                                                     'optional positive "timeout".'}
+
+        result = await self.solve(board, timeout)
+        return STATUSES.get(result["status"], 500), result
+
+    async def solve(self, board, timeout):
+        """
+        Solve a board in a worker process, within the deadline of the request.
+
+        Args:
+            board (numpy.ndarray): The start board.
+            timeout (float): The deadline of the request in seconds, None for no deadline.
+
+        Returns:
+            dict: The result of the solve.
+        """
+        if self.pending >= self.max_pending:
+            return {"status": "busy", "error": "Too many pending requests, retry later."}
+        deadline = timer.time() + timeout if timeout else None
+        self.pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self.slots.acquire(), timeout)
+            except asyncio.TimeoutError:
+                return {"status": "timeout"}
+            self.running += 1
+            try:
+                future = asyncio.get_running_loop().run_in_executor(self.executor, _solve_board, board, deadline)
+                try:
+                    return await asyncio.wait_for(future, deadline and deadline - timer.time() + DEADLINE_GRACE)
+                except asyncio.TimeoutError:
+                    return {"status": "timeout"}
+            finally:
+                self.running -= 1
+                self.slots.release()
+        finally:
+            self.pending -= 1
+
+
+async def _read_request(reader):
+    """
+    Read an HTTP request.
+
+    Args:
+        reader (asyncio.StreamReader): The stream of the connection.
+
+    Returns:
+        Tuple: The method, path, lower-case headers and body of the request, or None once the connection is closed.
+
+    Raises:
+        HttpError: If the request is malformed or its body too large.
+    """
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, path, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line.")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise HttpError(400, "Malformed Content-Length.")
+    if length > MAX_BODY:
+        raise HttpError(413, "The body is larger than %i bytes." % MAX_BODY)
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method, path, headers, body
+
+
+async def _write_response(writer, status, payload, keep_alive):
+    """
+    Write a JSON HTTP response.
+
+    Args:
+        writer (asyncio.StreamWriter): The writer of the connection.
+        status (int): The HTTP status, 503 responses also ask the client to retry later.
+        payload (dict): The JSON answer.
+        keep_alive (bool): Whether the connection stays open for the next request.
+    """
+    body = json.dumps(payload).encode()
+    headers = [
+        "HTTP/1.1 %i %s" % (status, REASONS.get(status, "")),
+        "Content-Type: application/json",
+        "Content-Length: %i" % len(body),
+        "Connection: %s" % ("keep-alive" if keep_alive else "close"),
+    ]
+    if status == 503:
+        headers.append("Retry-After: 1")
+    writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+def _init_worker(args):
+    """
+    Initialize a worker process with its own solver, building the tables of the common sizes.
+
+    Args:
+        args: Command-line arguments.
+    """
+    global _solver
+    args.verbose = False
+    _solver = Solver(args)
+    for size in WARM_SIZES:
+        try:
+            _solver.get_puzzle(size)
+        except ValueError:
+            pass
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_timeout)
+
+
+def _ready():
+    """
+    Do nothing, to start a worker process.
+    """
+
+
+def _solve_board(board, deadline):
+    """
+    Solve a board in a worker process, stopping at the deadline.
+
+    Args:
+        board (numpy.ndarray): The start board.
+        deadline (float): The time.time() deadline of the request, None for no deadline.
+
+    Returns:
+        dict: The result of the solve, with its moves and search counters once solved.
+    """
+    timeout = None
+    if deadline is not None and hasattr(signal, "setitimer"):
+        timeout = deadline - timer.time()
+        if timeout <= 0:
+            return {"status": "timeout"}
+
+    start = timer.perf_counter()
+    result = {}
+    try:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+        solution = _solver.solve(board)
+        result.update(status="solved", **solution.to_dict())
+        if solution.stats is not None:
+            result["stats"] = solution.stats
+    except UnsolvablePuzzleError as e:
+        result.update(status="unsolvable", reason=str(e))
+        if _solver.stats is not None:
+            result["stats"] = _solver.stats.report()
+    except BudgetExceededError as e:
+        result.update(status="budget_exceeded", error=str(e))
+        if _solver.stats is not None:
+            result["stats"] = _solver.stats.report()
+    except PuzzleTimeout:
+        result.update(status="timeout")
+    except Exception as e:
+        result.update(status="error", error=str(e) or type(e).__name__)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result["wall_clock"] = round(timer.perf_counter() - start, 6)
+    return result
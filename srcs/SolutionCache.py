@@ -0,0 +1,243 @@
+import os
+import time as timer
+import sqlite3
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+from Puzzle import _puzzle_for_size
+from SolveResult import MOVES, SolveResult
+from TableCache import CACHE_DIR, cache_path
+
+# Number of solutions kept in memory, and size of the on-disk cache in bytes
+MEMORY_ENTRIES = 1024
+DISK_BYTES = 256 * 1024 * 1024
+# Share of the on-disk entries evicted at once when it is full, least recently used first
+EVICTED_SHARE = 0.1
+
+# Linear parts (a, b, c, d) of the 8 symmetries of the square, mapping a vector (y, x) to (a y + b x, c y + d x)
+_DIHEDRAL = (
+    (1, 0, 0, 1), (0, -1, 1, 0), (-1, 0, 0, -1), (0, 1, -1, 0),
+    (-1, 0, 0, 1), (1, 0, 0, -1), (0, 1, 1, 0), (0, -1, -1, 0),
+)
+
+
+class SolutionCache:
+    def __init__(self, settings, path=None, memory_entries=MEMORY_ENTRIES, disk_bytes=DISK_BYTES):
+        """
+        Initialize the SolutionCache object.
+
+        Solutions are kept as move strings, in a least recently used memory tier
+        in front of an SQLite file. Every board is stored under its canonical
+        form: the smallest of its symmetric boards whose goal maps to the snail
+        goal itself, with its tiles renamed accordingly, so symmetric boards share
+        one entry and their moves are mirrored back on the way out.
+
+        Args:
+            settings (str): The search settings the solutions depend on.
+            path (str, optional): The SQLite file. Defaults to the table cache directory.
+            memory_entries (int, optional): The number of solutions kept in memory.
+            disk_bytes (int, optional): The size of the SQLite file beyond which old solutions are evicted.
+        """
+        self.settings = settings
+        self.path = path or cache_path("solutions.sqlite")
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.memory = OrderedDict()
+        self.connection = None
+        self.disk_failed = False
+
+    def get(self, matrix):
+        """
+        Get the cached solution of a board.
+
+        Args:
+            matrix (numpy.ndarray): The start board.
+
+        Returns:
+            SolveResult: The cached solution, or None if the board was not solved before.
+        """
+        start = timer.perf_counter()
+        key, _, backward = _canonical(matrix)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+        else:
+            entry = self._load(key)
+            if entry is None:
+                return None
+            self._remember(key, entry)
+        moves, time, space, bound = entry
+        return SolveResult(matrix, moves.translate(backward), time, space, 0.0, timer.perf_counter() - start, bound)
+
+    def put(self, matrix, result):
+        """
+        Cache the solution of a board.
+
+        Args:
+            matrix (numpy.ndarray): The start board.
+            result (SolveResult): The solution of the board.
+        """
+        key, forward, _ = _canonical(matrix)
+        entry = ("".join(result.moves).translate(forward), result.time, result.space, result.bound)
+        self._remember(key, entry)
+        self._store(key, entry)
+
+    def _remember(self, key, entry):
+        """
+        Keep a solution in the memory tier, evicting the least recently used one if it is full.
+
+        Args:
+            key (bytes): The canonical board.
+            entry (Tuple): The canonical moves, time complexity, space complexity and bound.
+        """
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _connect(self):
+        """
+        Open the SQLite file on first use.
+
+        Returns:
+            sqlite3.Connection: The connection, or None if the file cannot be used.
+        """
+        if self.connection is None and not self.disk_failed:
+            try:
+                os.makedirs(os.path.dirname(self.path) or CACHE_DIR, exist_ok=True)
+                self.connection = sqlite3.connect(self.path, timeout=10)
+                self.connection.execute(
+                    "CREATE TABLE IF NOT EXISTS solutions (settings TEXT, board BLOB, moves TEXT, time INTEGER, "
+                    "space INTEGER, bound REAL, used REAL, PRIMARY KEY (settings, board))")
+                self.connection.execute("CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)")
+                self.connection.commit()
+            except (OSError, sqlite3.Error):
+                # The cache is only an optimization, the memory tier still works without the file
+                self.disk_failed = True
+                self.connection = None
+        return self.connection
+
+    def _load(self, key):
+        """
+        Load a solution from the SQLite file, marking it as recently used.
+
+        Args:
+            key (bytes): The canonical board.
+
+        Returns:
+            Tuple: The canonical moves, time complexity, space complexity and bound, or None if not stored.
+        """
+        connection = self._connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute("SELECT moves, time, space, bound FROM solutions WHERE settings = ? AND board = ?",
+                                     (self.settings, key)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE solutions SET used = ? WHERE settings = ? AND board = ?",
+                                   (timer.time(), self.settings, key))
+                connection.commit()
+        except sqlite3.Error:
+            return None
+        return row
+
+    def _store(self, key, entry):
+        """
+        Store a solution in the SQLite file, evicting the least recently used ones while the file is too large.
+
+        Args:
+            key (bytes): The canonical board.
+            entry (Tuple): The canonical moves, time complexity, space complexity and bound.
+        """
+        connection = self._connect()
+        if connection is None:
+            return
+        try:
+            connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (self.settings, key) + entry + (timer.time(),))
+            while self._disk_size(connection) > self.disk_bytes:
+                count = connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+                if count <= 1:
+                    break
+                connection.execute("DELETE FROM solutions WHERE rowid IN "
+                                   "(SELECT rowid FROM solutions ORDER BY used LIMIT ?)",
+                                   (max(int(count * EVICTED_SHARE), 1),))
+            connection.commit()
+        except sqlite3.Error:
+            pass
+
+    @staticmethod
+    def _disk_size(connection):
+        """
+        Get the number of bytes used in the SQLite file, without its free pages.
+
+        Args:
+            connection (sqlite3.Connection): The connection.
+
+        Returns:
+            int: The used bytes.
+        """
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        free_count = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free_count) * page_size
+
+
+def _canonical(matrix):
+    """
+    Get the canonical form of a board, the smallest of its symmetric boards.
+
+    Args:
+        matrix (numpy.ndarray): The board.
+
+    Returns:
+        key (bytes): The canonical board, packed as bytes.
+        forward (dict): The translation table of the moves of the board to the moves of the canonical board.
+        backward (dict): The translation table of the moves of the canonical board to the moves of the board.
+    """
+    size = len(matrix)
+    board = np.ravel(matrix)
+    dtype = np.uint8 if size <= 16 else np.uint16
+    return min(((relabel[board[source]].astype(dtype).tobytes(), forward, backward)
+                for source, relabel, forward, backward in _symmetries(size)), key=lambda symmetric: symmetric[0])
+
+
+@lru_cache(maxsize=None)
+def _symmetries(size):
+    """
+    Get the symmetries of the square that keep the empty cell of the snail goal in place.
+
+    A symmetry moves the tile of each cell to its mirrored cell, renamed after
+    the goal tile of that cell, so the goal is mapped to itself. All 8 of them
+    keep the center of an odd size in place, only the identity and the
+    anti-transpose keep the empty cell of an even size.
+
+    Args:
+        size (int): The size of the puzzle grid.
+
+    Returns:
+        List[Tuple]: The source cell of every cell, the new name of every tile,
+            and the translation tables of the moves to and from the symmetric board.
+    """
+    puzzle = _puzzle_for_size(size)
+    goal = puzzle.goal_array
+    names = {offset: move for move, offset in MOVES.items()}
+    symmetries = []
+    for a, b, c, d in _DIHEDRAL:
+        def mirror(y, x):
+            u, v = 2 * y - (size - 1), 2 * x - (size - 1)
+            return (a * u + b * v + size - 1) // 2, (c * u + d * v + size - 1) // 2
+
+        if mirror(*puzzle.goal[0]) != puzzle.goal[0]:
+            continue
+        source = np.empty(size * size, dtype=np.intp)
+        relabel = np.empty(size * size, dtype=np.uint16)
+        for y in range(size):
+            for x in range(size):
+                y2, x2 = mirror(y, x)
+                source[y2 * size + x2] = y * size + x
+                relabel[goal[y, x]] = goal[y2, x2]
+        forward = {move: names[(a * dy + b * dx, c * dy + d * dx)] for move, (dy, dx) in MOVES.items()}
+        backward = {mirrored: move for move, mirrored in forward.items()}
+        symmetries.append((source, relabel, str.maketrans(forward), str.maketrans(backward)))
+    return symmetries
@@ -0,0 +1,116 @@
+from itertools import islice
+import numpy as np
+
+# Offsets of the zero tile for each move
+MOVES = {"U": (-1, 0), "D": (1, 0), "L": (0, -1), "R": (0, 1)}
+# Number of moves joined in each chunk of the streamed path
+CHUNK_SIZE = 65536
+
+
+class SolveResult:
+    def __init__(self, board, moves, time, space, setup_time, search_time, bound=1.0, stats=None):
+        """
+        Initialize the SolveResult object.
+
+        Args:
+            board (numpy.ndarray): The start board.
+            moves (List[str] | str | Iterator[str]): The moves of the zero tile, as 'U', 'D', 'L' or 'R'.
+                A string holds the moves of a cached solution, an iterator streams the moves
+                of the large board solver as they are produced.
+            time (int): Time complexity.
+            space (int): Space complexity.
+            setup_time (float): Seconds spent preparing the puzzle and its tables.
+            search_time (float): Seconds spent searching.
+            bound (float, optional): The path is proven to be at most this many times longer than
+                the shortest one, None if it has no bound. Defaults to 1, the shortest path.
+            stats (dict, optional): The report of the search stats, None if they were not collected.
+        """
+        self.board = board
+        self.moves = moves
+        self.time = time
+        self.space = space
+        self.setup_time = setup_time
+        self.search_time = search_time
+        self.bound = bound
+        self.stats = stats
+
+    def boards(self):
+        """
+        Generate every board of the solution, from the start board to the goal board.
+
+        Yields:
+            numpy.ndarray: The board after each move. The same array is updated in place.
+        """
+        board = np.array(self.board, dtype=np.uint16)
+        y, x = map(int, np.argwhere(board == 0)[0])
+        yield board
+        for move in self.moves:
+            dy, dx = MOVES[move]
+            board[y, x], board[y + dy, x + dx] = board[y + dy, x + dx], 0
+            y, x = y + dy, x + dx
+            yield board
+
+    def path_chunks(self, chunk_size=CHUNK_SIZE):
+        """
+        Generate the path as strings of moves, so it can be written without joining it whole.
+
+        Args:
+            chunk_size (int, optional): The number of moves of each chunk.
+
+        Yields:
+            str: The next moves of the zero tile, as 'U', 'D', 'L' and 'R' letters.
+        """
+        moves = iter(self.moves)
+        chunk = "".join(islice(moves, chunk_size))
+        while chunk:
+            yield chunk
+            chunk = "".join(islice(moves, chunk_size))
+
+    def to_dict(self):
+        """
+        Convert the result to a dictionary, for JSON output.
+
+        Returns:
+            dict: The moves, counters and timings of the result.
+        """
+        return dict(path="".join(self.moves), **self.totals(len(self.moves)))
+
+    def totals(self, moves):
+        """
+        Get the counters and timings of the result, for JSON output.
+
+        Args:
+            moves (int): The number of moves, known once a streamed path is written.
+
+        Returns:
+            dict: The moves, counters and timings of the result, without the path.
+        """
+        return {
+            "moves": moves,
+            "time": self.time,
+            "space": self.space,
+            "setup_time": round(self.setup_time, 6),
+            "search_time": round(self.search_time, 6),
+            "bound": self.bound,
+        }
+
+
+def get_moves(solution_state):
+    """
+    Rebuild the list of moves from the solution state, following the parent links.
+
+    Args:
+        solution_state (State | PackedState): The solution state.
+
+    Returns:
+        List[str]: The moves of the zero tile, from the start state to the solution state.
+    """
+    zero_tiles = []
+    state = solution_state
+    while state is not None:
+        zero_tiles.append(state.zero_tile)
+        state = state.parent
+    zero_tiles.reverse()
+
+    names = {offset: move for move, offset in MOVES.items()}
+    return [names[(y2 - y, x2 - x)] for (y, x), (y2, x2) in zip(zero_tiles, zero_tiles[1:])]
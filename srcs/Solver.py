@@ -1,10 +1,36 @@
 import sys
+import json
 import heapq
+import time as timer
 import numpy as np
-from Parser import Parser, parse_input_file
+from Errors import PuzzleError, UnsolvablePuzzleError, BudgetExceededError
+from Parser import Parser, parse_input_file, _handle_error
 from Heuristics import Heuristic
-from Puzzle import Puzzle
+from LargeSolver import LargeSolver, FINAL_SIZE as LARGE_FINAL_SIZE
+from Puzzle import Puzzle, check_solvable, _puzzle_for_size
 from State import State
+from OpenList import OpenList
+from ForgottenList import ForgottenList
+from NodeStore import NodeStore, NO_PARENT
+from PackedState import PackedState, MAX_SIZE as PACKED_MAX_SIZE
+from PatternDatabase import PatternDatabase, MAX_SIZE as PDB_MAX_SIZE
+from WalkingDistance import WalkingDistance, MAX_SIZE as WD_MAX_SIZE
+from SolveResult import SolveResult, get_moves
+from Stats import Stats
+
+FOUND = -1
+# Starting weight of the anytime search, and its decrease after every solution
+ANYTIME_WEIGHT = 3.0
+ANYTIME_STEP = 0.5
+# Expansions between two reads of the clock for the time budget
+BUDGET_INTERVAL = 256
+# Validation stages run on every start board before any search, each returning why it rejects a board, or None
+VALIDATION_STAGES = (check_solvable,)
+# Version of the search results, raised when a fix changes the paths found so older cached solutions are ignored
+_CACHE_VERSION = 3
+# Options changing the path found for a board, the cached solutions are kept apart for each of their values
+_CACHE_SETTINGS = ("greedy", "weight", "uniform", "misplaced", "manhattan", "linear", "pdb", "walking",
+                   "algorithm", "deadline", "large", "max_open", "max_nodes", "max_time")
 
 
 class Solver:
@@ -16,6 +42,19 @@ class Solver:
             args: Command-line arguments.
         """
         self.args = args
+        self.pdb = None
+        self.puzzles = {}
+        self.pdbs = {}
+        self.wd = None
+        self.wds = {}
+        self.bound = 1.0
+        self.report = None
+        self.stats = None
+        self.cache = None
+        self.validation_stages = list(VALIDATION_STAGES)
+        self.budget_deadline = None
+        # Whether the last path was returned because the search ran out of budget
+        self.budget_cut = False
 
     def get_heuristics(self, state, puzzle):
         """
@@ -27,11 +66,20 @@ class Solver:
         """
         if not self.args.uniform:
             if self.args.misplaced:
-                state.h_misplaced = Heuristic.misplaced_tiles(state.matrix, puzzle.goal)
+                state.h_misplaced = int(Heuristic.misplaced_tiles_batch(state.matrix[None], puzzle.goal_array)[0])
             if self.args.manhattan:
-                state.h_manhattan = Heuristic.manhattan_distance(state.matrix, puzzle.goal)
+                state.h_manhattan = int(Heuristic.manhattan_distance_batch(state.matrix[None],
+                                                                           puzzle.goal_coordinates)[0])
+            if self.args.linear:
+                state.h_linear = Heuristic.linear_conflict(state.matrix, puzzle.goal)
+            if self.args.pdb:
+                state.h_pdb, state.pdb_keys = Heuristic.pattern_database(state.matrix, self.pdb)
+            if self.args.walking:
+                state.h_walking, state.walking_keys = Heuristic.walking_distance(state.matrix, self.wd)
 
-        state.h_total = state.h_misplaced + state.h_manhattan
+        # The pattern database and the walking distance already count every tile, they are not additive with
+        # the other heuristics, so only the largest value is kept
+        state.h_total = max(state.h_misplaced + state.h_manhattan + state.h_linear, state.h_pdb, state.h_walking)
 
     def get_optimized_heuristics(self, state, puzzle):
         """
@@ -45,19 +93,41 @@ class Solver:
             if self.args.misplaced:
                 state.h_misplaced = Heuristic.misplaced_tile_single(state, puzzle.goal)
             if self.args.manhattan:
-                state.h_manhattan = Heuristic.manhattan_dist_single(state, puzzle.goal)
+                state.h_manhattan = Heuristic.manhattan_dist_single(state, puzzle)
+            if self.args.linear:
+                state.h_linear = Heuristic.linear_conflict_single(state, puzzle.goal)
+            if self.args.pdb:
+                state.h_pdb, state.pdb_keys = Heuristic.pattern_database_single(state, self.pdb)
+            if self.args.walking:
+                state.h_walking, state.walking_keys = Heuristic.walking_distance_single(state, self.wd)
+
+        state.h_total = max(state.h_misplaced + state.h_manhattan + state.h_linear, state.h_pdb, state.h_walking)
+
+    def get_priority(self, state):
+        """
+        Get the priority of a state in the open list, g + w * h, or h alone in greedy mode.
 
-        state.h_total = state.h_misplaced + state.h_manhattan
+        Args:
+            state (State | PackedState): The state.
+
+        Returns:
+            int | float: The priority of the state, lowest first.
+        """
+        if self.args.greedy:
+            return state.h_total
+        if self.args.weight == 1:
+            return state.g + state.h_total
+        return state.g + self.args.weight * state.h_total
 
     def solve_puzzle(self):
         """
-        Solve the puzzle based on the provided arguments.
+        Solve the puzzle based on the provided arguments, printing the solution.
         """
         shuffles_amount = 0
         if self.args.filepath:
             try:
                 puzzle_size, start_state = parse_input_file(self.args.filepath)
-            except Exception as e:
+            except PuzzleError as e:
                 _handle_error(e)
         else:
             puzzle_size = input("Please enter the n size of an n x n puzzle:\n")
@@ -70,109 +140,836 @@ class Solver:
                 print("Wrong input. Please enter a number above 0.")
                 shuffles_amount = input("How many times should the puzzle be shuffled?\n")
 
-        puzzle = Puzzle(int(puzzle_size))
+        try:
+            puzzle = self.get_puzzle(int(puzzle_size))
+        except ValueError as e:
+            print(e)
+            sys.exit()
+
+        if self.args.algorithm == "anytime":
+            self.report = self.print_improvement
 
         if puzzle.size == 1:
-            start_state = goal_state = State(puzzle.goal_array)
-            self.print_solution(goal_state, start_state, 1, 0)
+            self.print_solution(SolveResult(puzzle.goal_array, [], 1, 0, 0.0, 0.0))
 
-        puzzle.get_goal()
-        if self.args.filepath:
-            start_state = State(start_state)
-        else:
-            start_state = State(puzzle.goal_array)
-        start_state.zero_tile = start_state.find_zero()
-        start_state = puzzle.shuffle(start_state, int(shuffles_amount))
-        start_state.parent = None
-        self.get_heuristics(start_state, puzzle)
+        if not self.args.filepath:
+            start_state = State(np.copy(puzzle.goal_array))
+            start_state = puzzle.shuffle(start_state, int(shuffles_amount)).matrix
 
-        if self.args.filepath and not start_state.can_puzzle_be_solved(puzzle):
+        try:
+            if self.is_large(puzzle.size) and not self.args.cache:
+                self.validate(_puzzle_for_size(puzzle.size), start_state)
+                self.print_large_solution(start_state)
+            result = self.solve(start_state)
+        except UnsolvablePuzzleError as e:
+            if self.stats is not None:
+                self.write_stats(self.stats.report())
             print("Can't be solved")
+            print(e)
+            sys.exit()
+        except BudgetExceededError as e:
+            if self.stats is not None:
+                self.write_stats(self.stats.report())
+            print(e)
             sys.exit()
 
-        solution_state, time, space = self.a_star_search(puzzle, start_state)
+        if result.stats is not None:
+            self.write_stats(result.stats)
+        self.print_solution(result)
+
+    def solve(self, matrix):
+        """
+        Solve a board without printing or exiting.
+
+        Args:
+            matrix (numpy.ndarray): The start board.
+
+        Returns:
+            SolveResult: The moves, counters and timings of the solution.
+
+        Raises:
+            UnsolvablePuzzleError: If the board is rejected by a validation stage or cannot reach the goal.
+            BudgetExceededError: If the search exceeds its node or time budget.
+            ValueError: If the selected heuristics do not support this board.
+        """
+        self.budget_cut = False
+        cache = self.get_cache()
+        if cache is not None:
+            result = cache.get(matrix)
+            if result is None:
+                result = self.search_board(matrix)
+                # A path cut short by the budget depends on the speed of the run, it is not cached
+                if not self.budget_cut:
+                    cache.put(matrix, result)
+            return result
+        return self.search_board(matrix)
+
+    def search_board(self, matrix):
+        """
+        Solve a board with the selected search, or with the large board solver.
+
+        Args:
+            matrix (numpy.ndarray): The start board.
+
+        Returns:
+            SolveResult: The moves, counters and timings of the solution.
+
+        Raises:
+            UnsolvablePuzzleError: If the board is rejected by a validation stage or cannot reach the goal.
+            BudgetExceededError: If the search exceeds its node or time budget.
+            ValueError: If the selected heuristics do not support this board.
+        """
+        if self.is_large(len(matrix)):
+            return self.solve_large(matrix)
+
+        start = timer.perf_counter()
+        puzzle = self.get_puzzle(len(matrix))
+        start_state = State(np.array(matrix, dtype=np.uint16))
+        self.validate(puzzle, start_state.matrix)
+        setup_time = timer.perf_counter() - start
+
+        solution_state, start_state, time, space = self.search(puzzle, start_state)
+        if solution_state is None:
+            raise UnsolvablePuzzleError("Can't be solved")
+        search_time = timer.perf_counter() - start - setup_time
+
+        stats = self.stats.report() if self.stats is not None else None
+        return SolveResult(matrix, get_moves(solution_state), time, space, setup_time, search_time, self.bound, stats)
+
+    def solve_large(self, matrix):
+        """
+        Solve a large board side by side, without printing or exiting.
+
+        Args:
+            matrix (numpy.ndarray): The start board.
+
+        Returns:
+            SolveResult: The moves, counters and timings of the solution, with no suboptimality bound.
+
+        Raises:
+            UnsolvablePuzzleError: If the board is rejected by a validation stage or cannot reach the goal.
+            BudgetExceededError: If the search of the last region exceeds its node or time budget.
+        """
+        start = timer.perf_counter()
+        self.validate(_puzzle_for_size(len(matrix)), matrix)
+        large_solver = LargeSolver(self)
+        moves = list(large_solver.moves(matrix))
+        search_time = timer.perf_counter() - start
+        stats = self.stats.report() if self.stats is not None else None
+        return SolveResult(matrix, moves, large_solver.time, large_solver.space, 0.0, search_time, None, stats)
+
+    def validate(self, puzzle, matrix):
+        """
+        Run every validation stage on a start board, before any search.
+
+        In stats mode, a rejected board gets a stats report of its own, naming
+        the stage and the reason.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            matrix (numpy.ndarray): The start board.
+
+        Raises:
+            UnsolvablePuzzleError: With the reason of the first stage rejecting the board.
+        """
+        self.stats = None
+        for stage in self.validation_stages:
+            reason = stage(puzzle, matrix)
+            if reason is not None:
+                if self.args.stats:
+                    self.stats = Stats()
+                    self.stats.reject(stage.__name__, reason)
+                raise UnsolvablePuzzleError(reason)
+
+    def check_budget(self, time):
+        """
+        Stop the search once it expanded more states than the node budget, or ran longer than the time budget.
+
+        The clock is only read every BUDGET_INTERVAL expansions.
+
+        Args:
+            time (int): The number of states expanded so far.
+
+        Raises:
+            BudgetExceededError: If the search exceeded one of its budgets.
+        """
+        if self.args.max_nodes is not None and time > self.args.max_nodes:
+            raise BudgetExceededError("Search budget exceeded: more than %i states expanded."
+                                      % self.args.max_nodes)
+        if (self.budget_deadline is not None and time % BUDGET_INTERVAL == 0
+                and timer.perf_counter() > self.budget_deadline):
+            raise BudgetExceededError("Search budget exceeded: more than %g seconds of search."
+                                      % self.args.max_time)
+
+    def get_cache(self):
+        """
+        Get the solution cache of the search settings, creating it on first use.
+
+        Returns:
+            SolutionCache: The solution cache, or None if the cache is off.
+        """
+        if self.args.cache and self.cache is None:
+            settings = {name: getattr(self.args, name) for name in _CACHE_SETTINGS}
+            settings["version"] = _CACHE_VERSION
+            from SolutionCache import SolutionCache
+            self.cache = SolutionCache(json.dumps(settings, sort_keys=True))
+        return self.cache
+
+    def is_large(self, size):
+        """
+        Check if a puzzle of the given size is solved side by side by the large board solver.
+
+        Args:
+            size (int): The size of the puzzle grid.
+
+        Returns:
+            bool: True if the large board solver is selected and the puzzle is larger than its last region.
+        """
+        return self.args.large and size > LARGE_FINAL_SIZE
+
+    def get_puzzle(self, size):
+        """
+        Get the puzzle of the given size, building its goal and heuristic tables only once.
+
+        Args:
+            size (int): The size of the puzzle grid.
+
+        Returns:
+            Puzzle: The puzzle object representing the game.
+
+        Raises:
+            ValueError: If the selected heuristics do not support this puzzle.
+        """
+        if size not in self.puzzles:
+            if self.args.greedy and self.args.algorithm != "astar":
+                raise ValueError("Greedy search is only supported by A* search.")
+            if self.args.stats and self.args.algorithm != "astar":
+                raise ValueError("Search stats are only collected by A* search.")
+            if self.args.weight != 1 and self.args.algorithm in ("bidirectional", "parallel"):
+                raise ValueError("Weighted search is not supported by %s search." % self.args.algorithm)
+            if self.args.algorithm == "parallel" and (self.args.max_nodes is not None
+                                                      or self.args.max_time is not None):
+                raise ValueError("Search budgets are not supported by parallel search.")
+            if self.args.algorithm == "parallel" and size > PACKED_MAX_SIZE:
+                raise ValueError("Parallel search only supports puzzles up to %ix%i."
+                                 % (PACKED_MAX_SIZE, PACKED_MAX_SIZE))
+            puzzle = Puzzle(size)
+            if self.args.pdb and not self.args.uniform and not self.is_large(size):
+                if self.args.algorithm == "bidirectional":
+                    raise ValueError("Pattern database heuristic is only built for the snail goal, "
+                                     "not for bidirectional search.")
+                if size > PDB_MAX_SIZE:
+                    raise ValueError("Pattern database heuristic only supports puzzles up to %ix%i."
+                                     % (PDB_MAX_SIZE, PDB_MAX_SIZE))
+                self.pdbs[size] = PatternDatabase(puzzle)
+            if self.args.walking and not self.args.uniform and not self.is_large(size):
+                if self.args.algorithm == "bidirectional":
+                    raise ValueError("Walking distance heuristic is only built for the snail goal, "
+                                     "not for bidirectional search.")
+                if size > WD_MAX_SIZE:
+                    raise ValueError("Walking distance heuristic only supports puzzles up to %ix%i."
+                                     % (WD_MAX_SIZE, WD_MAX_SIZE))
+                self.wds[size] = WalkingDistance(puzzle)
+            self.puzzles[size] = puzzle
+        self.pdb = self.pdbs.get(size)
+        self.wd = self.wds.get(size)
+        return self.puzzles[size]
 
-        self.print_solution(solution_state, start_state, time, space)
+    def search(self, puzzle, start_state):
+        """
+        Compute the heuristics of the start state and run the selected search, without printing.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            start_state (State): The initial state of the puzzle.
+
+        Returns:
+            solution_state (State | PackedState): The solution state, or None if it can't be solved.
+            start_state (State | PackedState): The start state the solution is linked to.
+            time (int): Time complexity.
+            space (int): Space complexity.
+        """
+        self.get_heuristics(start_state, puzzle)
+        # Weighted A* paths are at most w times longer than the shortest one, greedy ones have no bound
+        self.bound = None if self.args.greedy else max(self.args.weight, 1.0)
+        self.stats = Stats() if self.args.stats else None
+        self.budget_deadline = None if self.args.max_time is None else timer.perf_counter() + self.args.max_time
+        if self.args.algorithm != "ida" and puzzle.size <= PACKED_MAX_SIZE:
+            start_state = PackedState.from_state(start_state)
+
+        solution_state, time, space = self.get_search()(puzzle, start_state)
+        return solution_state, start_state, time, space
+
+    def get_search(self):
+        """
+        Get the search method selected by the provided arguments.
+
+        Returns:
+            The bound search method, taking a puzzle and a start state.
+        """
+        return {
+            "astar": self.a_star_search,
+            "ida": self.ida_star_search,
+            "bidirectional": self.bidirectional_search,
+            "anytime": self.anytime_search,
+            "parallel": self.parallel_search,
+        }[self.args.algorithm]
+
+    def is_goal(self, state, puzzle):
+        """
+        Check if the given state is the goal state.
+
+        Args:
+            state (State): The state to check.
+            puzzle (Puzzle): The puzzle object representing the game.
+
+        Returns:
+            bool: True if the state is the goal state, False otherwise.
+        """
+        if state.h_total == 0:
+            if not self.args.uniform and (self.args.manhattan or self.args.pdb or self.args.walking):
+                return True
+            return state.is_goal(puzzle)
+        return False
 
     def a_star_search(self, puzzle, start_state):
         """
         Perform the A* search algorithm to find the solution.
 
+        The open list is bucketed by f-value. With a maximum open list size, the
+        worst open states are evicted SMA*-style: their board is forgotten, and
+        their f-value is backed up to their parent, which is queued in the
+        forgotten list. Whenever that backed-up f-value is lower than the best
+        open f-value, the parent is expanded again to regenerate the forgotten
+        children, so no branch is lost and the path stays the shortest.
+
+        Nodes live in a node store, and the open list refers to them by index: a
+        state is only built to expand its node, and the path is rebuilt from the
+        parent indexes once the goal is reached.
+
+        In stats mode, the open list, the seen set, the neighbour generation and
+        the heuristics are replaced by timed wrappers before the loop starts.
+
         Args:
             puzzle (Puzzle): The puzzle object representing the game.
-            start_state (State): The initial state of the puzzle.
+            start_state (State | PackedState): The initial state of the puzzle.
 
         Returns:
-            solution_state (State): The solution state.
+            solution_state (State | PackedState): The solution state, or None if it can't be solved.
             time (int): Time complexity.
             space (int): Space complexity.
         """
-        openset = []
-        seenset = {}
-        tiebreaker = 0
-        heapq.heappush(openset, (start_state.g + start_state.h_total, start_state.h_total, tiebreaker, start_state))
-        seenset[start_state.matrix.tobytes()] = start_state.g
+        stats = self.stats
+        store = NodeStore(puzzle, start_state, self.get_stored_heuristics())
+        openset = OpenList(self.args.max_open)
+        seenset = {} if stats is None else stats.timed_dict("seen")
+        get_neighbours = type(start_state).get_neighbours
+        get_heuristics = self.get_optimized_heuristics
+        if stats is not None:
+            openset.push = stats.timed("push", openset.push)
+            openset.pop = stats.timed("pop", openset.pop)
+            get_neighbours = stats.timed("neighbours", get_neighbours)
+            get_heuristics = stats.timed("heuristics", get_heuristics)
+        forgotten = ForgottenList()
+        self._push(openset, seenset, forgotten, store, start_state.key(), store.add(start_state, NO_PARENT),
+                   self.get_priority(start_state))
+        seenset[start_state.key()] = start_state.g
         time, space = 0, 0
+        budget = self.args.max_nodes is not None or self.args.max_time is not None
 
-        while openset:
-            current_state = heapq.heappop(openset)[3]
+        while openset or forgotten:
+            index = openset.pop()
+            current_state = None if index is None else store.state(index)
+            if forgotten:
+                # A forgotten child comes first when its backed-up f-value beats the best open state
+                f = None if current_state is None else self.get_priority(current_state)
+                if f is None or forgotten.peek_f() < f:
+                    if current_state is not None:
+                        openset.push(current_state.key(), index, f, current_state.h_total)
+                    index = forgotten.pop()
+                    if seenset.get(store.key(index)) != store.g[index]:
+                        # The board was reached again with a lower cost, that node regenerates the children
+                        continue
+                    current_state = store.state(index)
             if self.args.verbose:
                 print("Current node heuristic value:", current_state.h_total)
             time += 1
+            if budget:
+                self.check_budget(time)
+
+            if self.is_goal(current_state, puzzle):
+                return store.solution(index), time, space
 
-            if current_state.h_total == 0:
-                if not self.args.uniform and self.args.manhattan:
-                    return current_state, time, space
-                elif np.array_equal(current_state.matrix, puzzle.goal_array):
-                    return current_state, time, space
-
-            for matrix, zero_loc in current_state.get_neighbours(puzzle):
-                move = State(matrix)
-                move.zero_tile = zero_loc
-                move.parent = current_state
-                self.get_optimized_heuristics(move, puzzle)
-                move.g = current_state.g + 1
-                key = move.matrix.tobytes()
+            neighbours = get_neighbours(current_state, puzzle)
+            for board, zero_loc in neighbours:
+                move = current_state.child(board, zero_loc)
+                get_heuristics(move, puzzle)
+                key = move.key()
                 seen = key in seenset
                 if not seen or move.g < seenset[key]:
                     if not seen:
                         space += 1
                     seenset[key] = move.g
-                    heapq.heappush(openset, (move.g + move.h_total, move.h_total, tiebreaker, move))
-                    tiebreaker += 1
+                    self._push(openset, seenset, forgotten, store, key, store.add(move, index),
+                               self.get_priority(move))
+            if stats is not None:
+                stats.expand(len(neighbours), len(openset), len(seenset))
 
-        print("Can't be solved")
-        sys.exit()
+        return None, time, space
+
+    def get_stored_heuristics(self):
+        """
+        Get the heuristic values the node store keeps, the selected heuristics.
+
+        Returns:
+            Tuple[str]: The names of the heuristic values of the states.
+        """
+        if self.args.uniform:
+            return ()
+        names = ("misplaced", "manhattan", "linear", "pdb", "walking")
+        return tuple("h_" + name for name in names if getattr(self.args, name))
+
+    def _push(self, openset, seenset, forgotten, store, key, index, f):
+        """
+        Push a node in the open list, forgetting the nodes evicted by a bounded open list.
+
+        An evicted node is removed from the seen boards, so it can be generated
+        again, and its f-value is backed up to its parent in the forgotten list.
+        Expanded nodes stay in the seen boards, so the parent is always there,
+        unless its board was reached again with a lower cost, whose node then
+        generates the evicted board again itself.
+
+        Args:
+            openset (OpenList): The open list.
+            seenset (dict): The best cost of every board seen.
+            forgotten (ForgottenList): The expanded nodes with evicted children.
+            store (NodeStore): The node store.
+            key: The key identifying the board of the node.
+            index (int): The node.
+            f (int | float): The priority of the node.
+        """
+        for evicted in openset.push(key, index, f, store.h_total[index]):
+            del seenset[store.key(evicted)]
+            parent = store.parents[evicted]
+            if parent != NO_PARENT and seenset.get(store.key(parent)) == store.g[parent]:
+                forgotten.add(parent, self.get_priority(store.state(evicted)))
+
+    def parallel_search(self, puzzle, start_state):
+        """
+        Perform a hash-distributed A* search, spread over the worker processes of the workers option.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            start_state (PackedState): The initial state of the puzzle.
+
+        Returns:
+            solution_state (PackedState): The solution state, or None if it can't be solved.
+            time (int): Time complexity.
+            space (int): Space complexity.
+        """
+        from ParallelSearch import parallel_search
+        return parallel_search(self, puzzle, start_state, max(self.args.workers or 1, 1))
+
+    def anytime_search(self, puzzle, start_state):
+        """
+        Perform an anytime repairing A* (ARA*) search, improving its solution until the deadline.
+
+        A first path is found by weighted A*. The weight is then lowered, and the
+        search resumes from its open states and the expanded states whose cost
+        improved, instead of starting over. After each round, the proven bound of
+        the path is the ratio between its length and the lowest g + h left, and
+        the path and its bound are passed to the report callback whenever the path
+        got shorter or the bound lower. The search stops once the path is proven
+        to be the shortest, or at the deadline if a path was already found.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            start_state (State | PackedState): The initial state of the puzzle.
+
+        Returns:
+            solution_state (State | PackedState): The best solution state, or None if it can't be solved.
+            time (int): Time complexity.
+            space (int): Space complexity.
+        """
+        start = timer.perf_counter()
+        deadline = None if self.args.deadline is None else start + self.args.deadline
+        weight = self.args.weight if self.args.weight > 1 else ANYTIME_WEIGHT
+
+        openset = OpenList()
+        openset.push(start_state.key(), start_state, weight * start_state.h_total, start_state.h_total)
+        seenset = {start_state.key(): start_state}
+        closed = set()
+        inconsistent = set()
+        solution = None
+        # Length and bound of the last reported path
+        reported = (float("inf"), float("inf"))
+        time, space = 0, 0
+        budget = self.args.max_nodes is not None or self.args.max_time is not None
+
+        while True:
+            while openset and (solution is None or solution.g > openset.peek_f()):
+                if solution is not None and deadline is not None and timer.perf_counter() > deadline:
+                    return solution, time, space
+                current_state = openset.pop()
+                if self.args.verbose:
+                    print("Current node heuristic value:", current_state.h_total)
+                time += 1
+                if budget:
+                    try:
+                        self.check_budget(time)
+                    except BudgetExceededError:
+                        # Like at the deadline, the best path found so far is returned
+                        if solution is None:
+                            raise
+                        self.budget_cut = True
+                        return solution, time, space
+                closed.add(current_state.key())
+
+                if self.is_goal(current_state, puzzle):
+                    if solution is None or current_state.g < solution.g:
+                        solution = current_state
+                    continue
+
+                for board, zero_loc in current_state.get_neighbours(puzzle):
+                    move = current_state.child(board, zero_loc)
+                    key = move.key()
+                    seen = seenset.get(key)
+                    if seen is not None and seen.g <= move.g:
+                        continue
+                    if seen is None:
+                        space += 1
+                    self.get_optimized_heuristics(move, puzzle)
+                    seenset[key] = move
+                    if key in closed:
+                        inconsistent.add(key)
+                    else:
+                        openset.push(key, move, move.g + weight * move.h_total, move.h_total)
+
+            if solution is None:
+                return None, time, space
+
+            pending = list(openset) + [seenset[key] for key in inconsistent]
+            lower_bound = min((state.g + state.h_total for state in pending), default=solution.g)
+            self.bound = max(min(weight, solution.g / lower_bound), 1.0) if lower_bound else 1.0
+            if self.report is not None and (solution.g < reported[0] or self.bound < reported[1]):
+                reported = (solution.g, self.bound)
+                self.report(solution, self.bound, timer.perf_counter() - start)
+            if self.bound <= 1 or (deadline is not None and timer.perf_counter() > deadline):
+                return solution, time, space
+
+            weight = max(weight - ANYTIME_STEP, 1.0)
+            openset = OpenList()
+            for state in pending:
+                openset.push(state.key(), state, state.g + weight * state.h_total, state.h_total)
+            closed.clear()
+            inconsistent.clear()
+
+    def ida_star_search(self, puzzle, start_state):
+        """
+        Perform the iterative-deepening A* search algorithm to find the solution.
+
+        A single board is mutated in place with do/undo moves, so memory only
+        grows with the depth of the current path. Each iteration raises the
+        bound to the smallest f-value that exceeded the previous one.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            start_state (State): The initial state of the puzzle.
+
+        Returns:
+            solution_state (State): The solution state, or None if it can't be solved.
+            time (int): Time complexity.
+            space (int): Space complexity.
+        """
+        state = State(np.copy(start_state.matrix), start_state.zero_tile)
+        state.copy_heuristics(start_state)
+        # One frame per depth holds the values of the previous board for the incremental heuristics
+        frames = []
+        path = [state.zero_tile]
+        time, space = 0, 0
+        budget = self.args.max_nodes is not None or self.args.max_time is not None
+
+        def search(g, bound):
+            nonlocal time, space
+            f = g + self.args.weight * state.h_total
+            if f > bound:
+                return f
+            if self.args.verbose:
+                print("Current node heuristic value:", state.h_total)
+            time += 1
+            if budget:
+                self.check_budget(time)
+            space = max(space, len(path))
+
+            if self.is_goal(state, puzzle):
+                return FOUND
+
+            if len(frames) < len(path):
+                frames.append(State(state.matrix, state.zero_tile))
+            frame = frames[len(path) - 1]
+            frame.zero_tile = state.zero_tile
+            frame.copy_heuristics(state)
+
+            minimum = float("inf")
+            y, x = state.zero_tile
+            for cell in puzzle.neighbours[y * puzzle.size + x]:
+                y2, x2 = puzzle.coordinates[cell]
+                if len(path) > 1 and (y2, x2) == path[-2]:
+                    continue
+                state.parent = frame
+                state.move_zero(y2, x2)
+                self.get_optimized_heuristics(state, puzzle)
+                path.append((y2, x2))
+
+                result = search(g + 1, bound)
+                if result == FOUND:
+                    return FOUND
+
+                path.pop()
+                state.move_zero(y, x)
+                state.copy_heuristics(frame)
+                minimum = min(minimum, result)
+            return minimum
+
+        bound = self.args.weight * state.h_total
+        while True:
+            result = search(0, bound)
+            if result == FOUND:
+                return self._build_path(start_state, path), time, space
+            if result == float("inf"):
+                return None, time, space
+            bound = result
+
+    def bidirectional_search(self, puzzle, start_state):
+        """
+        Perform a bidirectional A* search, from the start state and from the goal state.
+
+        The backward search uses the same heuristics, measured towards the start
+        board. Both searches share the same board keys, and every time a board is
+        reached from both sides the best meeting cost is updated. The search stops
+        once no unexpanded state can lead to a cheaper path than the best meeting.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            start_state (State | PackedState): The initial state of the puzzle.
+
+        Returns:
+            solution_state (State | PackedState): The solution state, or None if it can't be solved.
+            time (int): Time complexity.
+            space (int): Space complexity.
+        """
+        backward_puzzle = puzzle.with_goal(start_state.matrix)
+        goal_state = State(np.copy(puzzle.goal_array))
+        self.get_heuristics(goal_state, backward_puzzle)
+        if isinstance(start_state, PackedState):
+            goal_state = PackedState.from_state(goal_state)
+
+        puzzles = (puzzle, backward_puzzle)
+        opensets = ([], [])
+        seensets = ({start_state.key(): start_state}, {goal_state.key(): goal_state})
+        heapq.heappush(opensets[0], (start_state.h_total, start_state.h_total, 0, start_state))
+        heapq.heappush(opensets[1], (goal_state.h_total, goal_state.h_total, 1, goal_state))
+        tiebreaker = 2
+        time, space = 0, 0
+
+        budget = self.args.max_nodes is not None or self.args.max_time is not None
+
+        best = float("inf")
+        meeting = None
+        if start_state.key() == goal_state.key():
+            best, meeting = 0, (start_state, goal_state)
+
+        while opensets[0] and opensets[1]:
+            if self.args.uniform:
+                lower_bound = opensets[0][0][0] + opensets[1][0][0]
+            else:
+                lower_bound = max(opensets[0][0][0], opensets[1][0][0])
+            if best <= lower_bound:
+                break
+
+            # Expand the side with the smaller frontier
+            side = 0 if len(opensets[0]) <= len(opensets[1]) else 1
+            openset, seenset, other_seenset = opensets[side], seensets[side], seensets[1 - side]
+            current_state = heapq.heappop(openset)[3]
+            if seenset[current_state.key()] is not current_state:
+                continue
+            if self.args.verbose:
+                print("Current node heuristic value:", current_state.h_total)
+            time += 1
+            if budget:
+                self.check_budget(time)
+
+            for board, zero_loc in current_state.get_neighbours(puzzles[side]):
+                move = current_state.child(board, zero_loc)
+                key = move.key()
+                seen = seenset.get(key)
+                if seen is not None and seen.g <= move.g:
+                    continue
+                if seen is None:
+                    space += 1
+                self.get_optimized_heuristics(move, puzzles[side])
+                seenset[key] = move
+                heapq.heappush(openset, (move.g + move.h_total, move.h_total, tiebreaker, move))
+                tiebreaker += 1
+
+                other = other_seenset.get(key)
+                if other is not None and move.g + other.g < best:
+                    best = move.g + other.g
+                    meeting = (move, other) if side == 0 else (other, move)
+
+        if meeting is None:
+            return None, time, space
 
-    def print_path(self, solution_state, start_state, moves):
+        # Reverse the parent links of the backward half, so the chain runs from the start to the goal
+        previous, state = meeting[0], meeting[1].parent
+        while state is not None:
+            following = state.parent
+            state.parent = previous
+            state.g = previous.g + 1
+            previous, state = state, following
+        return previous, time, space
+
+    @staticmethod
+    def _build_path(start_state, path):
         """
-        Print thesolution path from the solution state to the start state recursively.
+        Rebuild the chain of states from the start state and the zero tile locations along the path.
 
         Args:
-            solution_state (State): The solution state.
             start_state (State): The start state.
-            moves (int): The number of moves.
+            path (List[Tuple[int, int]]): The zero tile locations, starting with the one of the start state.
 
         Returns:
-            moves (int): The updated number of moves.
+            State: The solution state, linked to the start state through its parents.
+        """
+        state = start_state
+        for y2, x2 in path[1:]:
+            move = State(np.copy(state.matrix))
+            move.zero_tile = state.zero_tile
+            move.move_zero(y2, x2)
+            move.parent = state
+            move.g = state.g + 1
+            state = move
+        return state
+
+    def print_path(self, result):
         """
-        if solution_state is not start_state:
+        Print the solution path, from the start board to the goal board.
+
+        Args:
+            result (SolveResult): The solution.
+
+        Returns:
+            moves (int): The number of moves.
+        """
+        moves = -1
+        for board in result.boards():
+            print(board, '\n')
             moves += 1
-            moves = self.print_path(solution_state.parent, start_state, moves)
-        print(np.array(solution_state.matrix), '\n')  # Convert to numpy array before printing
         return moves
 
-    def print_solution(self, solution_state, start_state, time, space):
+    @staticmethod
+    def write_path(result, output):
         """
-        Print the final solution, including the total moves, time complexity, and space complexity.
+        Write the moves of the solution path as a single U/D/L/R string, one chunk at a time.
 
         Args:
-            solution_state (State): The solution state.
-            start_state (State): The start state.
-            time (int): Time complexity.
-            space (int): Space complexity.
+            result (SolveResult): The solution.
+            output: The text stream to write to.
+
+        Returns:
+            moves (int): The number of moves.
+        """
+        moves = 0
+        for chunk in result.path_chunks():
+            output.write(chunk)
+            moves += len(chunk)
+        return moves
+
+    def print_large_solution(self, matrix):
+        """
+        Print a large board solution as its moves are produced, then the totals.
+
+        Args:
+            matrix (numpy.ndarray): The start board.
+        """
+        start = timer.perf_counter()
+        large_solver = LargeSolver(self)
+        result = SolveResult(matrix, None, 0, 0, 0.0, 0.0, None)
+
+        def stream():
+            yield from large_solver.moves(matrix)
+            result.time, result.space = large_solver.time, large_solver.space
+            result.search_time = timer.perf_counter() - start
+            if self.stats is not None:
+                self.write_stats(self.stats.report())
+
+        result.moves = stream()
+        self.print_solution(result)
+
+    def write_stats(self, report):
+        """
+        Write the report of the search stats as JSON, to the stats file or to standard error.
+
+        Args:
+            report (dict): The report of the search stats.
+        """
+        if not self.args.stats_file:
+            json.dump(report, sys.stderr, indent=2)
+            sys.stderr.write("\n")
+            return
+        with open(self.args.stats_file, "w") as stats_file:
+            json.dump(report, stats_file, indent=2)
+
+    def print_improvement(self, solution_state, bound, elapsed):
+        """
+        Print a path found by the anytime search, with its proven bound.
+
+        In the json format, standard output only holds the JSON object, so the
+        progress goes to standard error.
+
+        Args:
+            solution_state (State | PackedState): The solution state.
+            bound (float): The path is at most this many times longer than the shortest one.
+            elapsed (float): Seconds since the search started.
+        """
+        print("Found %i moves, at most %.3f times the shortest path, after %.3f seconds"
+              % (solution_state.g, bound, elapsed), file=sys.stderr if self.args.format == "json" else sys.stdout)
+
+    def print_solution(self, result):
+        """
+        Print the final solution in the selected format, including the total moves, time complexity, and space complexity.
+
+        The path is written in chunks as its moves are produced, full boards are only printed in the boards format.
+
+        Args:
+            result (SolveResult): The solution.
+        """
+        output = sys.stdout
+        if self.args.format == "boards":
+            np.set_printoptions(linewidth=1000, threshold=10000)
+            moves = self.print_path(result)
+        elif self.args.format == "json":
+            output.write('{"path": "')
+            moves = self.write_path(result, output)
+            output.write('", %s\n' % json.dumps(result.totals(moves))[1:])
+            sys.exit()
+        else:
+            moves = self.write_path(result, output)
+            output.write("\n")
+        self.print_totals(result, moves)
+
+    @staticmethod
+    def print_totals(result, moves):
+        """
+        Print the total moves, time complexity, space complexity and suboptimality bound of a solution, then exit.
+
+        Args:
+            result (SolveResult): The solution.
+            moves (int): The number of moves.
         """
-        np.set_printoptions(linewidth=1000, threshold=10000)
-        moves = self.print_path(solution_state, start_state, 0)
-        print("Total moves:\t\t%10i\nTime complexity:\t%10i\nSpace complexity:\t%10i" % (moves, time, space))
+        print("Total moves:\t\t%10i\nTime complexity:\t%10i\nSpace complexity:\t%10i" % (moves, result.time, result.space))
+        if result.bound is None:
+            print("Suboptimality bound:\t      none")
+        elif result.bound > 1:
+            print("Suboptimality bound:\t%10.3f" % result.bound)
         sys.exit()
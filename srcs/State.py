@@ -3,20 +3,26 @@ from random import choice
 
 
 class State:
-    def __init__(self, matrix):
+    def __init__(self, matrix, zero_tile=None):
         """
         Initialize the State object.
 
         Args:
             matrix (List[List[int]]): The matrix representing the state.
+            zero_tile (Tuple[int, int], optional): The coordinates of the zero tile, found if not given.
         """
         self.matrix = matrix
         self.parent = None
         self.h_total = 0
         self.h_misplaced = 0
         self.h_manhattan = 0
+        self.h_linear = 0
+        self.h_pdb = 0
+        self.pdb_keys = None
+        self.h_walking = 0
+        self.walking_keys = None
         self.g = 0
-        self.zero_tile = self.find_zero()
+        self.zero_tile = zero_tile if zero_tile is not None else self.find_zero()
 
     def find_zero(self):
         """
@@ -30,14 +36,88 @@ class State:
                 if self.matrix[y][x] == 0:
                     return y, x
 
+    def copy_heuristics(self, other):
+        """
+        Copy the heuristic values of another state.
+
+        Args:
+            other (State | PackedState): The state to copy the heuristic values from.
+        """
+        self.h_total = other.h_total
+        self.h_misplaced = other.h_misplaced
+        self.h_manhattan = other.h_manhattan
+        self.h_linear = other.h_linear
+        self.h_pdb = other.h_pdb
+        self.pdb_keys = other.pdb_keys
+        self.h_walking = other.h_walking
+        self.walking_keys = other.walking_keys
+
+    def tile_at(self, y, x):
+        """
+        Get the tile at the given coordinates.
+
+        Args:
+            y (int): The y-coordinate of the cell.
+            x (int): The x-coordinate of the cell.
+
+        Returns:
+            int: The tile value.
+        """
+        return self.matrix[y][x]
+
+    def key(self):
+        """
+        Get the key identifying the matrix in the seen set.
+
+        Returns:
+            bytes: The raw bytes of the matrix.
+        """
+        return self.matrix.tobytes()
+
+    def is_goal(self, puzzle):
+        """
+        Check if the matrix is the goal matrix of the puzzle.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+
+        Returns:
+            bool: True if the matrix is the goal matrix, False otherwise.
+        """
+        return np.array_equal(self.matrix, puzzle.goal_array)
+
+    def child(self, matrix, zero_tile):
+        """
+        Create a child state one move away from this state.
+
+        Args:
+            matrix (numpy.ndarray): The matrix of the child.
+            zero_tile (Tuple[int, int]): The coordinates of the zero tile in the child.
+
+        Returns:
+            State: The child state.
+        """
+        move = State(matrix, zero_tile)
+        move.parent = self
+        move.g = self.g + 1
+        return move
+
+    def move_zero(self, y2, x2):
+        """
+        Move the zero tile in place by swapping it with the tile at the given coordinates.
+
+        Args:
+            y2 (int): The y-coordinate the zero tile moves to.
+            x2 (int): The x-coordinate the zero tile moves to.
+        """
+        y, x = self.zero_tile
+        self.matrix[y, x], self.matrix[y2, x2] = self.matrix[y2, x2], self.matrix[y, x]
+        self.zero_tile = y2, x2
+
     def can_puzzle_be_solved(self, puzzle):
         """
         Check if the current state of the puzzle can be solved.
 
-        This is based on the principle that a puzzle state is solvable if the 
-        number of inversions is even, considering also the distance of the empty 
-        space from the center of the puzzle.
-
         Args:
             puzzle (Puzzle): An instance of the Puzzle class representing the 
                             current puzzle.
@@ -45,28 +125,11 @@ class State:
         Returns:
             bool: True if the puzzle can be solved, False otherwise.
         """
-
-        total_inversions = 0
-        for row_index in range(len(self.matrix)):
-            for column_index, item in enumerate(self.matrix[row_index]):
-                if item == 0:
-                    zero_row = row_index
-                    zero_column = column_index
-                column_index_2, row_index_2 = column_index + 1, row_index
-                while row_index_2 < puzzle.size:
-                    while column_index_2 < puzzle.size:
-                        if not (self.matrix[row_index_2][column_index_2] in puzzle.goal_array[(puzzle.goal[item])[0]][puzzle.goal[item][1]:]) \
-                        and not any(self.matrix[row_index_2][column_index_2] in row for row in puzzle.goal_array[(puzzle.goal[item])[0]+1:][:]):
-                            total_inversions += 1
-                        column_index_2 += 1
-                    row_index_2 += 1
-                    column_index_2 = 0
-
-        return (total_inversions + puzzle.size) % 2 is not (abs(puzzle.size // 2 - zero_column) + abs(puzzle.size // 2 - zero_row)) % 2
+        return puzzle.is_solvable(self.matrix)
 
     def get_neighbours(self, puzzle):
         """
-        Generate and return the neighbor states.
+        Generate and return the neighbor states, from the neighbour table of the puzzle.
 
         Args:
             puzzle (Puzzle): The puzzle object representing the game.
@@ -75,38 +138,17 @@ class State:
             Tuple: A tuple containing the neighbor states and zero tile coordinates.
         """
         y, x = self.zero_tile
-        if self.parent:
-            yp, xp = self.parent.zero_tile
-        neighbour_coords = _get_neighbour_coordinates(puzzle.size, y, x)
+        zero = y * puzzle.size + x
+        back = self.parent.zero_tile if self.parent else None
         neighbours = []
-        zero_locs = []
 
-        for i in range(len(neighbour_coords)):
-            y2, x2 = neighbour_coords[i]
-            if self.parent and (y2, x2) == (yp, xp):
+        for cell in puzzle.neighbours[zero]:
+            zero_loc = puzzle.coordinates[cell]
+            if zero_loc == back:
                 continue
-            neighbour_matrix = np.copy(self.matrix)
-            neighbour_matrix[y][x], neighbour_matrix[y2][x2] = neighbour_matrix[y2][x2], neighbour_matrix[y][x]
-            neighbours.append(neighbour_matrix)
-            zero_locs.append((y2, x2))
-
-        return tuple(zip(neighbours, zero_locs))
-
-
-def _get_neighbour_coordinates(size, y, x):
-    """
-    Get the coordinates of the neighboring cells for a given cell.
-
-    Args:
-        size (int): The size of the puzzle grid.
-        y (int): The y-coordinate of the cell.
-        x (int): The x-coordinate of the cell.
-
-    Returns:
-        List[Tuple[int, int]]: The coordinates of the neighboring cells.
-    """
-    return [
-        (y2, x2)
-        for y2, x2 in [(y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)]
-        if 0 <= y2 < size and 0 <= x2 < size
-    ]
+            neighbour_matrix = self.matrix.copy()
+            flat = neighbour_matrix.ravel()
+            flat[zero], flat[cell] = flat[cell], 0
+            neighbours.append((neighbour_matrix, zero_loc))
+
+        return tuple(neighbours)
@@ -0,0 +1,147 @@
+import time as timer
+from collections import Counter
+
+# Number of expansions between two samples of the expansion rate
+RATE_INTERVAL = 4096
+
+
+class Stats:
+    def __init__(self):
+        """
+        Initialize the Stats object.
+
+        The search only reaches the stats through timed wrappers and one call per
+        expansion, and only when the stats mode is on, so the search loop runs
+        unchanged when it is off.
+        """
+        self.start = timer.perf_counter()
+        self.timers = {}
+        self.expansions = 0
+        self.peak_open = 0
+        self.peak_seen = 0
+        self.branching = Counter()
+        self.rate = []
+        self.last_sample = (self.start, 0)
+        self.rejected = None
+
+    def timed(self, name, function):
+        """
+        Wrap a function so its calls and the time spent in it are counted.
+
+        Args:
+            name (str): The name of the timer.
+            function: The function to wrap.
+
+        Returns:
+            The wrapped function.
+        """
+        timer_entry = self.timers.setdefault(name, [0, 0.0])
+        perf_counter = timer.perf_counter
+
+        def wrapper(*args):
+            start = perf_counter()
+            try:
+                return function(*args)
+            finally:
+                timer_entry[0] += 1
+                timer_entry[1] += perf_counter() - start
+
+        return wrapper
+
+    def timed_dict(self, name):
+        """
+        Create a dictionary whose lookups and updates are counted and timed.
+
+        Args:
+            name (str): The name of the timer.
+
+        Returns:
+            dict: The empty timed dictionary.
+        """
+        return _TimedDict(self.timed(name, lambda operation, *args: operation(*args)))
+
+    def expand(self, children, open_size, seen_size):
+        """
+        Record an expansion, its number of children and the sizes of the open list and the seen set after it.
+
+        Args:
+            children (int): The number of children generated.
+            open_size (int): The number of states in the open list.
+            seen_size (int): The number of boards in the seen set.
+        """
+        self.expansions += 1
+        self.branching[children] += 1
+        if open_size > self.peak_open:
+            self.peak_open = open_size
+        if seen_size > self.peak_seen:
+            self.peak_seen = seen_size
+        if self.expansions % RATE_INTERVAL == 0:
+            now = timer.perf_counter()
+            last_time, last_expansions = self.last_sample
+            self.rate.append({
+                "elapsed": round(now - self.start, 6),
+                "expansions": self.expansions,
+                "per_second": round((self.expansions - last_expansions) / max(now - last_time, 1e-9), 1),
+            })
+            self.last_sample = (now, self.expansions)
+
+    def reject(self, stage, reason):
+        """
+        Record that a validation stage rejected the board before any search.
+
+        Args:
+            stage (str): The name of the validation stage.
+            reason (str): The reason the board was rejected.
+        """
+        self.rejected = {"stage": stage, "reason": reason}
+
+    def report(self):
+        """
+        Get the structured report of the stats, for JSON output.
+
+        Returns:
+            dict: The timers, peak sizes, expansion rate samples and branching factor histogram,
+                and the validation stage that rejected the board, if any.
+        """
+        elapsed = timer.perf_counter() - self.start
+        report = {
+            "elapsed": round(elapsed, 6),
+            "expansions": self.expansions,
+            "expansions_per_second": round(self.expansions / elapsed, 1) if elapsed else None,
+            "peak_open": self.peak_open,
+            "peak_seen": self.peak_seen,
+            "timers": {name: {"calls": calls, "seconds": round(seconds, 6)}
+                       for name, (calls, seconds) in self.timers.items()},
+            "branching": {str(children): count for children, count in sorted(self.branching.items())},
+            "rate": self.rate,
+        }
+        if self.rejected is not None:
+            report["rejected"] = self.rejected
+        return report
+
+
+class _TimedDict(dict):
+    def __init__(self, timed):
+        """
+        Initialize the _TimedDict object, passing its lookups and updates through a timed function.
+
+        Args:
+            timed: The timed function, called with the dict operation and its arguments.
+        """
+        super().__init__()
+        self._timed = timed
+
+    def __contains__(self, key):
+        return self._timed(super().__contains__, key)
+
+    def __getitem__(self, key):
+        return self._timed(super().__getitem__, key)
+
+    def __setitem__(self, key, value):
+        self._timed(super().__setitem__, key, value)
+
+    def __delitem__(self, key):
+        self._timed(super().__delitem__, key)
+
+    def get(self, key, default=None):
+        return self._timed(super().get, key, default)
@@ -0,0 +1,59 @@
+import os
+import numpy as np
+
+CACHE_DIR = os.environ.get("NPUZZLE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "npuzzle"))
+
+
+def cache_path(filename):
+    """
+    Get the path of a file in the table cache directory.
+
+    Args:
+        filename (str): The name of the cached file.
+
+    Returns:
+        str: The path of the file in the cache directory.
+    """
+    return os.path.join(CACHE_DIR, filename)
+
+
+def load_table(filename):
+    """
+    Load a cached table, memory-mapped so only the pages that are read get loaded.
+
+    Args:
+        filename (str): The name of the cached file.
+
+    Returns:
+        numpy.ndarray: The memory-mapped table, or None if it is not cached yet.
+    """
+    path = cache_path(filename)
+    if not os.path.exists(path):
+        return None
+    try:
+        return np.load(path, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def save_table(filename, table):
+    """
+    Save a table in the cache directory.
+
+    The table is written to a temporary file first, so concurrent runs never
+    load a partially written table.
+
+    Args:
+        filename (str): The name of the cached file.
+        table (numpy.ndarray): The table to save.
+    """
+    path = cache_path(filename)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporary = "%s.%i.tmp" % (path, os.getpid())
+        with open(temporary, "wb") as cache_file:
+            np.save(cache_file, table)
+        os.replace(temporary, path)
+    except OSError:
+        # The cache is only an optimization, the table can be rebuilt next time
+        pass
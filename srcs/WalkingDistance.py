@@ -0,0 +1,166 @@
+import numpy as np
+from TableCache import load_table, save_table
+
+MAX_SIZE = 4
+# Axes of the two tables, the rows and the columns of the tiles
+ROWS, COLUMNS = 0, 1
+
+
+class WalkingDistance:
+    def __init__(self, puzzle):
+        """
+        Initialize the WalkingDistance object, loading its tables from the cache or building them.
+
+        The walking distance counts the vertical and the horizontal moves apart.
+        For the vertical moves, a board is reduced to its row pattern: how many
+        tiles of each goal row are in each row, and the row of the zero tile. A
+        vertical move brings one tile of the row next to the zero tile into its
+        row, whatever its column. The row table holds the number of such moves
+        from every row pattern to the goal one, found by breadth-first search.
+        The column table is built the same way, and both values are added.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+        """
+        self.size = puzzle.size
+        self.cells = puzzle.size ** 2
+        # Goal row and goal column of every tile
+        self.goal_lines = [[puzzle.goal[tile][axis] for tile in range(self.cells)] for axis in (ROWS, COLUMNS)]
+        self.indexes = []
+        self.distances = []
+        self.transitions = []
+        for axis in (ROWS, COLUMNS):
+            table = self._load_or_build(puzzle, axis)
+            patterns = table[:, :self.cells + 1].tolist()
+            self.indexes.append({tuple(pattern): index for index, pattern in enumerate(patterns)})
+            self.distances.append(table[:, self.cells + 1].tolist())
+            self.transitions.append(table[:, self.cells + 2:].tolist())
+
+    def keys(self, matrix):
+        """
+        Compute the index of the row pattern and of the column pattern of the board.
+
+        Args:
+            matrix (numpy.ndarray): The current state matrix.
+
+        Returns:
+            Tuple[int]: The index of the board in the row table and in the column table.
+        """
+        keys = []
+        for axis in (ROWS, COLUMNS):
+            goal_lines = self.goal_lines[axis]
+            pattern = [0] * (self.cells + 1)
+            for cell, tile in enumerate(np.ravel(matrix)):
+                line = divmod(cell, self.size)[axis]
+                if tile:
+                    pattern[line * self.size + goal_lines[tile]] += 1
+                else:
+                    pattern[self.cells] = line
+            keys.append(self.indexes[axis][tuple(pattern)])
+        return tuple(keys)
+
+    def lookup(self, keys):
+        """
+        Get the walking distance for the given pattern indexes.
+
+        Args:
+            keys (Tuple[int]): The index in the row table and in the column table.
+
+        Returns:
+            int: The sum of the vertical and horizontal moves.
+        """
+        return self.distances[ROWS][keys[ROWS]] + self.distances[COLUMNS][keys[COLUMNS]]
+
+    def update(self, h, keys, tile, src, dst):
+        """
+        Update the heuristic value after a tile move, only looking up the table of the axis of the move.
+
+        Args:
+            h (int): The heuristic value before the move.
+            keys (Tuple[int]): The index in the row table and in the column table before the move.
+            tile (int): The moved tile.
+            src (int): The cell number the tile left.
+            dst (int): The cell number the tile entered.
+
+        Returns:
+            h (int): The heuristic value after the move.
+            keys (Tuple[int]): The index in the row table and in the column table after the move.
+        """
+        src_y, src_x = divmod(src, self.size)
+        dst_y, dst_x = divmod(dst, self.size)
+        if src_y != dst_y:
+            axis, direction = ROWS, src_y > dst_y
+        else:
+            axis, direction = COLUMNS, src_x > dst_x
+        # The zero tile moves the other way, from the cell the tile entered to the cell it left
+        key = self.transitions[axis][keys[axis]][direction * self.size + self.goal_lines[axis][int(tile)]]
+        h += self.distances[axis][key] - self.distances[axis][keys[axis]]
+        return h, (key, keys[COLUMNS]) if axis == ROWS else (keys[ROWS], key)
+
+    def _load_or_build(self, puzzle, axis):
+        """
+        Load the table of an axis from the cache, or build and cache it.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            axis (int): ROWS or COLUMNS.
+
+        Returns:
+            numpy.ndarray: The table of the axis.
+        """
+        filename = "wd_%i_%s.npy" % (self.size, "rows" if axis == ROWS else "columns")
+        table = load_table(filename)
+        if table is None:
+            table = self._build_table(puzzle, axis)
+            save_table(filename, table)
+        return table
+
+    def _build_table(self, puzzle, axis):
+        """
+        Build the table of an axis by breadth-first search from the goal pattern.
+
+        A pattern holds the number of tiles of goal line j in line i at index
+        i * size + j, then the line of the zero tile. Moving the zero tile to the
+        previous or next line brings a tile of that line into the line it left.
+
+        Args:
+            puzzle (Puzzle): The puzzle object representing the game.
+            axis (int): ROWS or COLUMNS.
+
+        Returns:
+            numpy.ndarray: One row per pattern: the pattern, its number of moves to the goal, then
+                for the zero tile moving to the previous line, then to the next line, the index of
+                the pattern reached by moving a tile of each goal line, -1 if there is none.
+        """
+        size, cells = self.size, self.cells
+        blank = puzzle.goal[0][axis]
+        goal = [0] * (cells + 1)
+        for line in range(size):
+            goal[line * size + line] = size - (line == blank)
+        goal[cells] = blank
+
+        patterns = [tuple(goal)]
+        distances = [0]
+        indexes = {patterns[0]: 0}
+        transitions = []
+        for index, pattern in enumerate(patterns):
+            line = pattern[cells]
+            moves = [-1] * (2 * size)
+            for direction, next_line in enumerate((line - 1, line + 1)):
+                if not 0 <= next_line < size:
+                    continue
+                for goal_line in range(size):
+                    if pattern[next_line * size + goal_line]:
+                        moved = list(pattern)
+                        moved[next_line * size + goal_line] -= 1
+                        moved[line * size + goal_line] += 1
+                        moved[cells] = next_line
+                        moved = tuple(moved)
+                        if moved not in indexes:
+                            indexes[moved] = len(patterns)
+                            patterns.append(moved)
+                            distances.append(distances[index] + 1)
+                        moves[direction * size + goal_line] = indexes[moved]
+            transitions.append(moves)
+
+        return np.hstack([np.array(patterns), np.array(distances)[:, None], np.array(transitions)]).astype(np.int32)
@@ -6,6 +6,16 @@ def main():
     parser = Parser()
     args = parser.parse_arguments()
 
+    # The batch and server modes are imported on use, a single solve doesn't pay for their process pool and asyncio
+    if args.batch:
+        from Batch import run_batch
+        run_batch(args)
+        return
+    if args.serve:
+        from Server import run_server
+        run_server(args)
+        return
+
     # Create a solver object and solve the puzzle
     solver = Solver(args)
     solver.solve_puzzle()